@@ -1,7 +1,15 @@
+from . import controllers
 from . import wizard
 from . import models
 from . import report
+from .models.account_move_line import MOVE_LINES_DELETION_TABLE, REPORT_INDEXES
 
 
 def _pre_init_clean_m2m_models(env):
     env.cr.execute("""DROP TABLE IF EXISTS account_journal_account_report_partner_ledger_rel""")
+
+
+def _uninstall_drop_report_indexes(env):
+    for index_name in REPORT_INDEXES:
+        env.cr.execute("DROP INDEX IF EXISTS %s" % index_name)
+    env.cr.execute("DROP TABLE IF EXISTS %s" % MOVE_LINES_DELETION_TABLE)
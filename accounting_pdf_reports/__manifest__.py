@@ -16,11 +16,14 @@
     'live_test_url': 'https://www.youtube.com/watch?v=yA4NLwOLZms',
     'data': [
         'security/ir.model.access.csv',
+        'security/security.xml',
         'data/account_account_type.xml',
+        'data/ir_cron.xml',
         'views/menu.xml',
         'views/ledger_menu.xml',
         'views/financial_report.xml',
         'views/settings.xml',
+        'views/report_job.xml',
         'wizard/account_report_common_view.xml',
         'wizard/partner_ledger.xml',
         'wizard/general_ledger.xml',
@@ -40,6 +43,12 @@
         'report/report_journal_audit.xml',
         'report/report_journal_entries.xml',
     ],
+    'assets': {
+        'web.assets_backend': [
+            'accounting_pdf_reports/static/src/**/*',
+        ],
+    },
     'pre_init_hook': '_pre_init_clean_m2m_models',
+    'uninstall_hook': '_uninstall_drop_report_indexes',
     'images': ['static/description/banner.gif'],
 }
@@ -0,0 +1,28 @@
+from werkzeug.exceptions import NotFound
+from werkzeug.wsgi import wrap_file
+from odoo import http
+from odoo.http import request, content_disposition
+
+
+class AccountReportExport(http.Controller):
+
+    @http.route('/accounting_pdf_reports/export/<string:model>/<int:wizard_id>/<string:file_format>',
+                type='http', auth='user')
+    def export_report(self, model, wizard_id, file_format, **kwargs):
+        if file_format not in ('csv', 'xlsx') or model not in request.env:
+            raise NotFound()
+        wizard = request.env[model].browse(wizard_id).exists()
+        if not wizard or not isinstance(wizard, type(request.env['account.common.report'])):
+            raise NotFound()
+        action = wizard._get_export_action()
+        if action.get('type') != 'ir.actions.report':
+            raise NotFound()
+        output, filename, mimetype = request.env['account.report.tabular.export']._export(action, file_format)
+        size = output.seek(0, 2)
+        output.seek(0)
+        headers = [
+            ('Content-Type', mimetype),
+            ('Content-Length', size),
+            ('Content-Disposition', content_disposition(filename)),
+        ]
+        return request.make_response(wrap_file(request.httprequest.environ, output), headers=headers)
@@ -1,3 +1,7 @@
 from . import account_account_type
 from . import account_financial_report
 from . import account_move_line
+from . import account_tax
+from . import account_report_job
+from . import account_ledger_browser
+from . import account_report_benchmark
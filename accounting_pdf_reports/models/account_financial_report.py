@@ -1,4 +1,4 @@
-from odoo import api, models, fields
+from odoo import api, models, fields, tools
 
 
 class AccountFinancialReport(models.Model):
@@ -16,6 +16,8 @@ class AccountFinancialReport(models.Model):
             report.level = level
 
     def _get_children_by_order(self):
+        if len(self) == 1:
+            return self.browse(self._get_children_ids_by_order(self.id))
         res = self
         children = self.search([('parent_id', 'in', self.ids)], order='sequence ASC')
         if children:
@@ -23,6 +25,32 @@ class AccountFinancialReport(models.Model):
                 res += child._get_children_by_order()
         return res
 
+    @api.model
+    @tools.ormcache('report_id')
+    def _get_children_ids_by_order(self, report_id):
+        '''Returns a tuple with the IDs of the report and all its descendants, flattened
+           in tree order (siblings sorted by sequence). The whole report tree is loaded
+           with a single query, the result is cached until report lines are modified.'''
+        self.flush_model(['parent_id', 'sequence'])
+        self.env.cr.execute("""
+            SELECT id, parent_id
+            FROM account_financial_report
+            ORDER BY sequence, id""")
+        children = {}
+        for child_id, parent_id in self.env.cr.fetchall():
+            children.setdefault(parent_id, []).append(child_id)
+        res = []
+        seen = set()
+        stack = [report_id]
+        while stack:
+            current_id = stack.pop()
+            if current_id in seen:
+                continue
+            seen.add(current_id)
+            res.append(current_id)
+            stack.extend(reversed(children.get(current_id, [])))
+        return tuple(res)
+
     name = fields.Char('Report Name', required=True, translate=True)
     parent_id = fields.Many2one('account.financial.report', 'Parent')
     children_ids = fields.One2many('account.financial.report', 'parent_id', 'Account Report')
@@ -72,3 +100,16 @@ class AccountFinancialReport(models.Model):
              "financial reports hierarchy (auto-computed field 'level').")
     children_ids = fields.One2many('account.financial.report', 'parent_id', string='Children')
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env.registry.clear_cache()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if 'parent_id' in vals or 'sequence' in vals:
+            self.env.registry.clear_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        self.env.registry.clear_cache()
+        return super().unlink()
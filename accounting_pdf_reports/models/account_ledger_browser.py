@@ -0,0 +1,203 @@
+from odoo import api, models, _
+from odoo.exceptions import UserError
+
+# number of move lines sent to the web client per page
+LEDGER_BROWSER_PAGE_SIZE = 80
+
+# report wizards which can be browsed, with the report computing their sections
+LEDGER_BROWSER_REPORTS = {
+    'account.report.general.ledger': 'report.accounting_pdf_reports.report_general_ledger',
+    'account.report.partner.ledger': 'report.accounting_pdf_reports.report_partnerledger',
+}
+
+
+class AccountLedgerBrowser(models.AbstractModel):
+    _name = 'account.ledger.browser'
+    _description = 'Interactive Ledger'
+
+    @api.model
+    def _get_wizard_data(self, model, wizard_id):
+        if model not in LEDGER_BROWSER_REPORTS:
+            raise UserError(_("This report cannot be browsed."))
+        wizard = self.env[model].browse(wizard_id).exists()
+        if not wizard:
+            raise UserError(_("The options of this ledger are not available anymore, please open it again."))
+        action = wizard.check_report()
+        if action.get('type') != 'ir.actions.report':
+            raise UserError(_("This report cannot be browsed."))
+        return action['data']
+
+    @api.model
+    def _get_general_ledger_filter(self, data, initial_bal=False):
+        context = dict(data['form'].get('used_context', {}))
+        if initial_bal:
+            context.update(date_to=False, initial_bal=True)
+        if data['form'].get('analytic_account_ids'):
+            context['analytic_account_ids'] = self.env['account.analytic.account'].browse(
+                data['form']['analytic_account_ids'])
+        if data['form'].get('partner_ids'):
+            context['partner_ids'] = self.env['res.partner'].browse(data['form']['partner_ids'])
+        where_clause, where_params = self.env['account.move.line'].with_context(context)._query_get_aliased()
+        if where_clause.strip():
+            where_clause = " AND " + where_clause.strip()
+        return where_clause, where_params
+
+    @api.model
+    def _get_partner_ledger_filter(self, data):
+        where_clause, where_params = self.env['account.move.line'].with_context(
+            data['form'].get('used_context', {}))._query_get_aliased()
+        where_clause = " AND m.state IN %s AND l.account_id IN %s" + (
+            where_clause.strip() and " AND " + where_clause.strip())
+        if not data['form']['reconciled']:
+            where_clause += " AND l.full_reconcile_id IS NULL"
+        params = [tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'] or [0])]
+        return where_clause, params + where_params
+
+    @api.model
+    def _get_general_ledger_sections(self, data):
+        form = data['form']
+        if form.get('account_ids'):
+            accounts = self.env['account.account'].browse(form['account_ids'])
+        else:
+            accounts = self.env['account.account'].search([])
+        sections = {
+            account.id: {'id': account.id, 'code': account.code, 'name': account.name,
+                         'opening': 0.0, 'debit': 0.0, 'credit': 0.0, 'count': 0}
+            for account in accounts
+        }
+        if not sections:
+            return []
+        if form.get('initial_balance'):
+            where_clause, where_params = self._get_general_ledger_filter(data, initial_bal=True)
+            self.env.cr.execute("""
+                SELECT l.account_id, COALESCE(SUM(l.debit), 0) - COALESCE(SUM(l.credit), 0)
+                FROM account_move_line l
+                JOIN account_move m ON (l.move_id = m.id)
+                WHERE l.account_id IN %s""" + where_clause + """
+                GROUP BY l.account_id""", [tuple(sections)] + where_params)
+            for account_id, opening in self.env.cr.fetchall():
+                sections[account_id]['opening'] = opening
+        where_clause, where_params = self._get_general_ledger_filter(data)
+        self.env.cr.execute("""
+            SELECT l.account_id, COALESCE(SUM(l.debit), 0), COALESCE(SUM(l.credit), 0), COUNT(*)
+            FROM account_move_line l
+            JOIN account_move m ON (l.move_id = m.id)
+            WHERE l.account_id IN %s""" + where_clause + """
+            GROUP BY l.account_id""", [tuple(sections)] + where_params)
+        for account_id, debit, credit, count in self.env.cr.fetchall():
+            sections[account_id].update(debit=debit, credit=credit, count=count)
+
+        company_currency = self.env.company.currency_id
+        res = []
+        for account in accounts:
+            section = sections[account.id]
+            section['balance'] = section['opening'] + section['debit'] - section['credit']
+            currency = account.currency_id or company_currency
+            if form['display_account'] == 'movement' and not section['count']:
+                continue
+            if form['display_account'] == 'not_zero' and currency.is_zero(section['balance']):
+                continue
+            res.append(section)
+        return sorted(res, key=lambda section: section['code'] or '')
+
+    @api.model
+    def _get_partner_ledger_sections(self, data):
+        partner_ids = self.env[LEDGER_BROWSER_REPORTS['account.report.partner.ledger']]._get_partner_ids(data)
+        partners = self.env['res.partner'].browse(partner_ids)
+        sections = {
+            partner.id: {'id': partner.id, 'code': partner.ref or '', 'name': partner.name,
+                         'opening': 0.0, 'debit': 0.0, 'credit': 0.0, 'count': 0}
+            for partner in partners
+        }
+        if not sections:
+            return []
+        where_clause, where_params = self._get_partner_ledger_filter(data)
+        self.env.cr.execute("""
+            SELECT l.partner_id, COALESCE(SUM(l.debit), 0), COALESCE(SUM(l.credit), 0), COUNT(*)
+            FROM account_move_line l
+            JOIN account_move m ON (l.move_id = m.id)
+            WHERE l.partner_id IN %s""" + where_clause + """
+            GROUP BY l.partner_id""", [tuple(sections)] + where_params)
+        for partner_id, debit, credit, count in self.env.cr.fetchall():
+            sections[partner_id].update(debit=debit, credit=credit, count=count)
+        for section in sections.values():
+            section['balance'] = section['debit'] - section['credit']
+        return sorted(sections.values(), key=lambda section: (section['code'], section['name'] or ''))
+
+    @api.model
+    def get_sections(self, model, wizard_id):
+        """ Return the header of the ledger and its sections (the accounts of a
+            general ledger, the partners of a partner ledger) with their totals,
+            computed with grouped queries without fetching any move line.
+
+            The opening balance of each section is returned in its first cursor,
+            the web client sends it back with every page so that the running
+            balance never has to be recomputed from the start of the section.
+        """
+        data = self._get_wizard_data(model, wizard_id)
+        if model == 'account.report.general.ledger':
+            sections = self._get_general_ledger_sections(data)
+        else:
+            sections = self._get_partner_ledger_sections(data)
+        for section in sections:
+            section['cursor'] = {'date': False, 'move_id': 0, 'id': 0, 'balance': section['opening']}
+        return {
+            'title': self.env[model]._description,
+            'currency_id': self.env.company.currency_id.id,
+            'date_from': data['form'].get('date_from') or False,
+            'date_to': data['form'].get('date_to') or False,
+            'sections': sections,
+        }
+
+    @api.model
+    def get_lines(self, model, wizard_id, section_id, cursor, limit=LEDGER_BROWSER_PAGE_SIZE):
+        """ Return the page of move lines of a section following `cursor`, by
+            keyset pagination on (date, move_id, id): the cost of a page does not
+            depend on its position in the ledger.
+
+            Returns a dictionary {
+                'lines': list of move lines with their running 'balance',
+                'cursor': the cursor of the next page, False on the last page,
+            }
+        """
+        data = self._get_wizard_data(model, wizard_id)
+        if model == 'account.report.general.ledger':
+            section_clause = "l.account_id = %s"
+            where_clause, where_params = self._get_general_ledger_filter(data)
+        else:
+            section_clause = "l.partner_id = %s"
+            self.env[LEDGER_BROWSER_REPORTS[model]]._compute_report_scope(data)
+            where_clause, where_params = self._get_partner_ledger_filter(data)
+        params = [section_id] + where_params
+        keyset_clause = ""
+        if cursor.get('date'):
+            keyset_clause = " AND (l.date, l.move_id, l.id) > (%s, %s, %s)"
+            params += [cursor['date'], cursor['move_id'], cursor['id']]
+        self.env.cr.execute("""
+            SELECT l.id, l.date, l.move_id, m.name AS move_name, j.code AS journal_code,
+                   l.account_id, p.name AS partner_name,
+                   l.ref, l.name, l.debit, l.credit, l.amount_currency, l.currency_id
+            FROM account_move_line l
+            JOIN account_move m ON (l.move_id = m.id)
+            JOIN account_journal j ON (l.journal_id = j.id)
+            LEFT JOIN res_partner p ON (l.partner_id = p.id)
+            WHERE """ + section_clause + where_clause + keyset_clause + """
+            ORDER BY l.date, l.move_id, l.id
+            LIMIT %s""", params + [limit + 1])
+        lines = self.env.cr.dictfetchall()
+        # the codes of the accounts depend on the company, read them through the ORM
+        accounts = self.env['account.account'].browse({line['account_id'] for line in lines})
+        account_codes = {account.id: account.code for account in accounts}
+        next_cursor = False
+        if len(lines) > limit:
+            lines = lines[:limit]
+            next_cursor = True
+        balance = cursor.get('balance') or 0.0
+        for line in lines:
+            balance += line['debit'] - line['credit']
+            line['balance'] = balance
+            line['account_code'] = account_codes[line.pop('account_id')]
+        if next_cursor:
+            last = lines[-1]
+            next_cursor = {'date': last['date'], 'move_id': last['move_id'], 'id': last['id'], 'balance': balance}
+        return {'lines': lines, 'cursor': next_cursor}
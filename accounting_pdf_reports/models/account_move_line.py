@@ -1,18 +1,220 @@
 import ast
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dateutil.relativedelta import relativedelta
 from odoo import api, models, fields
 
+# context keys read by _query_get, the compiled clauses only depend on them
+QUERY_GET_CONTEXT_KEYS = (
+    'aged_balance', 'date_from', 'date_to', 'strict_range', 'initial_bal',
+    'journal_ids', 'state', 'company_id', 'allowed_company_ids', 'reconcile_date',
+    'account_tag_ids', 'account_ids', 'analytic_tag_ids', 'analytic_account_ids',
+    'partner_ids', 'partner_categories',
+)
+
+# indexes matching the filters and sort orders of the report queries:
+# account balances per company (trial balance, financial reports, general ledger),
+# journal audit and day book, aged balance on the maturity date, partner ledger
+REPORT_INDEXES = {
+    'accounting_pdf_reports_aml_company_account_date_idx':
+        "(company_id, account_id, date) INCLUDE (journal_id, parent_state, debit, credit)",
+    'accounting_pdf_reports_aml_journal_date_move_idx':
+        "(journal_id, date, move_id) WHERE parent_state != 'cancel'",
+    'accounting_pdf_reports_aml_company_maturity_idx':
+        "(company_id, (COALESCE(date_maturity, date)), partner_id)",
+    'accounting_pdf_reports_aml_partner_date_idx':
+        "(partner_id, date) WHERE partner_id IS NOT NULL",
+    'accounting_pdf_reports_aml_account_date_move_idx':
+        "(account_id, date, move_id, id)",
+    # last write date and last ID of the lines of a company, for the fingerprints
+    'accounting_pdf_reports_aml_company_write_date_idx':
+        "(company_id, write_date)",
+    'accounting_pdf_reports_aml_company_id_idx':
+        "(company_id, id)",
+}
+
+# append-only log of the deletions of move lines per company, part of the
+# fingerprints: every deletion inserts a row, so that no row is shared and locked
+# by concurrent transactions
+MOVE_LINES_DELETION_TABLE = 'accounting_pdf_reports_aml_deletion'
+
+# maximum number of companies aggregated concurrently in consolidation mode,
+# each one holds a database connection while it runs
+CONSOLIDATION_MAX_WORKERS = 4
+
+# per company partial aggregates of the consolidated reports, shared by the
+# requests of this worker: {key: (fingerprint, partial)}
+_consolidation_cache = {}
+_consolidation_cache_lock = threading.Lock()
+_CONSOLIDATION_CACHE_SIZE = 256
+
+
+def _freeze_query_get_value(value):
+    if isinstance(value, models.BaseModel):
+        return value._name, tuple(value.ids)
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze_query_get_value(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze_query_get_value(item)) for key, item in value.items()))
+    return value
+
 
 class AccountMoveLine(models.Model):
     _inherit = "account.move.line"
 
+    def init(self):
+        super().init()
+        for index_name, definition in REPORT_INDEXES.items():
+            self.env.cr.execute("CREATE INDEX IF NOT EXISTS %s ON account_move_line %s" % (index_name, definition))
+        # replaced by the deletion log, its single row per company was a hot spot
+        self.env.cr.execute("DROP TABLE IF EXISTS accounting_pdf_reports_aml_version")
+        self.env.cr.execute("""
+            CREATE TABLE IF NOT EXISTS %s (
+                id BIGSERIAL PRIMARY KEY,
+                company_id INTEGER NOT NULL
+            )""" % MOVE_LINES_DELETION_TABLE)
+        self.env.cr.execute("CREATE INDEX IF NOT EXISTS %s_company_id_idx ON %s (company_id, id)"
+                            % (MOVE_LINES_DELETION_TABLE, MOVE_LINES_DELETION_TABLE))
+
+    def unlink(self):
+        company_ids = self.company_id.ids
+        res = super().unlink()
+        if company_ids:
+            # deleted lines leave no trace in the last write date and ID
+            self.env.cr.execute("INSERT INTO %s (company_id) SELECT unnest(%%s)" % MOVE_LINES_DELETION_TABLE,
+                                [company_ids])
+        return res
+
+    @api.autovacuum
+    def _gc_move_lines_deletions(self):
+        """ Only the last deletion of every company is part of the fingerprints. """
+        self.env.cr.execute("""
+            DELETE FROM %s AS d
+            WHERE d.id < (SELECT MAX(id) FROM %s WHERE company_id = d.company_id)
+        """ % (MOVE_LINES_DELETION_TABLE, MOVE_LINES_DELETION_TABLE))
+
+    @api.model
+    def _check_report_indexes(self):
+        """ Run EXPLAIN on a query representative of each report index, with the
+            current company and the last year as period, and return a dictionary
+            with key=the name of an index and value=True if the planner uses it.
+
+            The planner only picks an index when it is worth it on the actual data,
+            so on small databases sequential scans are expected.
+        """
+        company_id = self.env.company.id
+        date_to = fields.Date.context_today(self)
+        date_from = date_to - relativedelta(years=1)
+        journal_ids = tuple(self.env['account.journal'].search([('company_id', '=', company_id)]).ids) or (0,)
+        partner_ids = tuple(self.env['res.partner'].search([], limit=100).ids) or (0,)
+        queries = {
+            'accounting_pdf_reports_aml_company_account_date_idx': ("""
+                SELECT account_id, SUM(debit), SUM(credit)
+                FROM account_move_line
+                WHERE company_id = %s AND date BETWEEN %s AND %s AND parent_state = 'posted'
+                GROUP BY account_id""", (company_id, date_from, date_to)),
+            'accounting_pdf_reports_aml_journal_date_move_idx': ("""
+                SELECT id
+                FROM account_move_line
+                WHERE journal_id IN %s AND date BETWEEN %s AND %s AND parent_state != 'cancel'
+                ORDER BY date, move_id""", (journal_ids, date_from, date_to)),
+            'accounting_pdf_reports_aml_company_maturity_idx': ("""
+                SELECT id
+                FROM account_move_line
+                WHERE company_id = %s AND COALESCE(date_maturity, date) BETWEEN %s AND %s""",
+                (company_id, date_from, date_to)),
+            'accounting_pdf_reports_aml_partner_date_idx': ("""
+                SELECT id
+                FROM account_move_line
+                WHERE partner_id IN %s
+                ORDER BY partner_id, date""", (partner_ids,)),
+            'accounting_pdf_reports_aml_account_date_move_idx': ("""
+                SELECT id
+                FROM account_move_line
+                WHERE account_id = (SELECT MIN(id) FROM account_account)
+                ORDER BY date, move_id, id
+                LIMIT 80""", ()),
+            'accounting_pdf_reports_aml_company_write_date_idx': ("""
+                SELECT MAX(write_date)
+                FROM account_move_line
+                WHERE company_id = %s""", (company_id,)),
+            'accounting_pdf_reports_aml_company_id_idx': ("""
+                SELECT MAX(id)
+                FROM account_move_line
+                WHERE company_id = %s""", (company_id,)),
+        }
+        self.flush_model()
+        res = {}
+        for index_name, (query, params) in queries.items():
+            self.env.cr.execute("EXPLAIN (FORMAT JSON) " + query, params)
+            plan = json.dumps(self.env.cr.fetchone()[0])
+            res[index_name] = '"%s"' % index_name in plan
+        return res
+
+    def _query_get_cache_key(self, domain):
+        context = self._context or {}
+        return (
+            self.env.uid,
+            self.env.su,
+            self.env.company.id,
+            tuple(self.env.companies.ids),
+            tuple((key, _freeze_query_get_value(context.get(key))) for key in QUERY_GET_CONTEXT_KEYS),
+            repr(domain),
+        )
+
     @api.model
     def _query_get(self, domain=None):
+        """ Returns the tables, the where clause and its params filtering the move
+            lines according to the report options found in the context.
+
+            The compiled clauses are memoized on the cursor for the current
+            transaction, keyed on the relevant context values, the user and the
+            companies, so that reports calling it for every partner, journal or
+            report line only build the domain and apply the record rules once.
+        """
+        self.check_access('read')
+        cache = self.env.cr.cache.setdefault('accounting_pdf_reports_query_get', {})
+        key = self._query_get_cache_key(domain)
+        if key not in cache:
+            cache[key] = self._compile_query_get(domain)
+        tables, where_clause, where_clause_params = cache[key]
+        return tables, where_clause, list(where_clause_params)
+
+    @api.model
+    def _query_get_aliased(self, alias='l', move_alias='m', domain=None):
+        """ Same filter as _query_get, with the where clause rewritten to use
+            `alias` for the move lines table and `move_alias` for the joined moves,
+            for the queries selecting "FROM account_move_line l JOIN account_move m".
+
+            Returns a tuple (where_clause, where_clause_params).
+        """
         self.check_access('read')
+        cache = self.env.cr.cache.setdefault('accounting_pdf_reports_query_get_aliased', {})
+        key = (self._query_get_cache_key(domain), alias, move_alias)
+        if key not in cache:
+            dummy, where_clause, where_clause_params = self._query_get(domain)
+            aliases = {
+                'account_move_line': alias,
+                'account_move_line__move_id': move_alias,
+            }
+            where_clause = re.sub(
+                r'"(account_move_line(?:__move_id)?)"',
+                lambda match: '"%s"' % aliases[match.group(1)],
+                where_clause,
+            )
+            cache[key] = where_clause, tuple(where_clause_params)
+        where_clause, where_clause_params = cache[key]
+        return where_clause, list(where_clause_params)
 
+    @api.model
+    def _compile_query_get(self, domain=None):
         context = dict(self._context or {})
         domain = domain or []
         if not isinstance(domain, (list, tuple)):
             domain = ast.literal_eval(domain)
+        domain = list(domain)
 
         date_field = 'date'
         if context.get('aged_balance'):
@@ -74,4 +276,146 @@ class AccountMoveLine(models.Model):
             from_string, from_params = query.from_clause
             where_string, where_params = query.where_clause
             tables, where_clause, where_clause_params = from_string, where_string, from_params + where_params
-        return tables, where_clause, where_clause_params
+        return tables, where_clause, tuple(where_clause_params)
+
+    @api.model
+    def _get_move_lines_fingerprints(self, company_ids, cr=None):
+        """ Returns a dictionary with key=the ID of a company and value=a tuple
+            (last write date, max id, last deletion) of its move lines, as seen by `cr`
+            (the cursor of the environment by default), which changes whenever
+            lines are posted, created, modified or removed. Each value is read from
+            an index or from the log of deletions, without scanning the lines.
+        """
+        if cr is None:
+            self.flush_model()
+            cr = self.env.cr
+        cr.execute("""
+            SELECT c.id,
+                   (SELECT MAX(write_date) FROM account_move_line WHERE company_id = c.id),
+                   (SELECT MAX(id) FROM account_move_line WHERE company_id = c.id),
+                   (SELECT MAX(id) FROM %s WHERE company_id = c.id)
+            FROM unnest(%%s) AS c(id)""" % MOVE_LINES_DELETION_TABLE, [list(company_ids)])
+        return {row[0]: tuple(row[1:]) for row in cr.fetchall()}
+
+    @api.model
+    def _get_consolidated_account_balances(self):
+        """ Returns a dictionary with key=the ID of an account and value={
+                'debit', 'credit', 'balance'} summed over all the allowed companies
+            and expressed in the currency of the current company.
+
+            The partial aggregate of every company is computed on its own cursor in a
+            thread pool, by account and month. The accounts bringing their balance
+            forward (balance sheet) are translated at the closing rate of the period,
+            the other ones (profit and loss) month by month at the rate of the end of
+            each month, then the partials are merged.
+
+            Partials are kept between runs, with the fingerprint of the move lines
+            read on the cursor which computed them, and reused as long as the move
+            lines of their company did not change. When the current transaction sees
+            other move lines than a new cursor (pending writes), the partial is
+            computed on the current cursor and not kept.
+        """
+        self.check_access('read')
+        target_company = self.env.company
+        target_currency = target_company.currency_id
+        run_cache = self.env.cr.cache.setdefault('accounting_pdf_reports_consolidation', {})
+        run_key = self._query_get_cache_key(None)
+        if run_key in run_cache:
+            return run_cache[run_key]
+
+        companies = self.env.companies
+        fingerprints = self._get_move_lines_fingerprints(companies.ids)
+
+        partials = {}
+        to_compute = {}
+        for company in companies:
+            key = (self.env.cr.dbname,) + self.with_context(
+                company_id=company.id, allowed_company_ids=[company.id])._query_get_cache_key(None)
+            with _consolidation_cache_lock:
+                cached = _consolidation_cache.get(key)
+            if cached and cached[0] == fingerprints.get(company.id):
+                partials[company.id] = cached[1]
+            else:
+                to_compute[company.id] = key
+
+        if self.env.registry.in_test_mode():
+            # a single cursor whose writes are rolled back, nothing is kept
+            for company_id in to_compute:
+                partials[company_id] = self._compute_consolidation_partial(self.env.cr, company_id)
+            computed = {}
+        elif to_compute:
+            with ThreadPoolExecutor(max_workers=min(len(to_compute), CONSOLIDATION_MAX_WORKERS)) as executor:
+                futures = {
+                    company_id: executor.submit(self._compute_consolidation_partial_thread, company_id)
+                    for company_id in to_compute
+                }
+                computed = {company_id: future.result() for company_id, future in futures.items()}
+        else:
+            computed = {}
+        with _consolidation_cache_lock:
+            if len(_consolidation_cache) + len(computed) > _CONSOLIDATION_CACHE_SIZE:
+                _consolidation_cache.clear()
+            for company_id, (fingerprint, partial) in computed.items():
+                _consolidation_cache[to_compute[company_id]] = (fingerprint, partial)
+                if fingerprint != fingerprints.get(company_id):
+                    # the new cursor does not see the pending writes of this transaction
+                    partial = self._compute_consolidation_partial(self.env.cr, company_id)
+                partials[company_id] = partial
+
+        date_to = self._context.get('date_to') or fields.Date.context_today(self)
+        date_to = fields.Date.to_date(date_to)
+        account_ids = {account_id for partial in partials.values() for account_id, dummy, dummy, dummy in partial}
+        forward_account_ids = set(self.env['account.account'].browse(account_ids).filtered('include_initial_balance').ids)
+        rates = {}
+
+        def translate(amount, currency, date):
+            if currency == target_currency:
+                return amount
+            if (currency, date) not in rates:
+                rates[currency, date] = self.env['res.currency']._get_conversion_rate(
+                    currency, target_currency, target_company, date)
+            return target_currency.round(amount * rates[currency, date])
+
+        res = {}
+        for company in companies:
+            currency = company.currency_id
+            for account_id, month, debit, credit in partials[company.id]:
+                if account_id in forward_account_ids:
+                    date = date_to
+                else:
+                    date = min(month + relativedelta(months=1, days=-1), date_to)
+                vals = res.setdefault(account_id, {'debit': 0.0, 'credit': 0.0, 'balance': 0.0})
+                debit = translate(debit, currency, date)
+                credit = translate(credit, currency, date)
+                vals['debit'] += debit
+                vals['credit'] += credit
+                vals['balance'] += debit - credit
+        run_cache[run_key] = res
+        return res
+
+    def _compute_consolidation_partial_thread(self, company_id):
+        """ Returns the fingerprint of the move lines of the company and its partial,
+            both read on a new cursor.
+        """
+        with self.env.registry.cursor() as cr:
+            fingerprint = self._get_move_lines_fingerprints([company_id], cr=cr).get(company_id)
+            return fingerprint, self._compute_consolidation_partial(cr, company_id)
+
+    def _compute_consolidation_partial(self, cr, company_id):
+        """ Debit and credit per account and month of a single company, in its
+            currency, as a tuple of (account ID, first day of the month, debit,
+            credit).
+        """
+        env = api.Environment(cr, self.env.uid, dict(
+            self._context, company_id=company_id, allowed_company_ids=[company_id]))
+        tables, where_clause, where_params = env['account.move.line']._query_get()
+        tables = tables.replace('"', '') if tables else "account_move_line"
+        wheres = [""]
+        if where_clause.strip():
+            wheres.append(where_clause.strip())
+        filters = " AND ".join(wheres)
+        cr.execute("SELECT account_id, date_trunc('month', account_move_line.date)::date,"
+                   " COALESCE(SUM(debit), 0), COALESCE(SUM(credit), 0)"
+                   " FROM " + tables + " WHERE TRUE " + filters + " GROUP BY 1, 2",
+                   tuple(where_params))
+        return tuple(cr.fetchall())
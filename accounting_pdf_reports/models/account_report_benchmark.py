@@ -0,0 +1,358 @@
+import json
+import logging
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+from odoo import api, fields, models, Command, release, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+BENCHMARK_COMPANY_NAME = 'Report Benchmark'
+
+# (name, wizard model, module of the report) of the engines timed by the benchmark
+BENCHMARK_ENGINES = [
+    ('general_ledger', 'account.report.general.ledger', 'accounting_pdf_reports'),
+    ('trial_balance', 'account.balance.report', 'accounting_pdf_reports'),
+    ('financial_report', 'accounting.report', 'accounting_pdf_reports'),
+    ('partner_ledger', 'account.report.partner.ledger', 'accounting_pdf_reports'),
+    ('aged_balance', 'account.aged.trial.balance', 'accounting_pdf_reports'),
+    ('journal_audit', 'account.print.journal', 'accounting_pdf_reports'),
+    ('tax_report', 'account.tax.report.wizard', 'accounting_pdf_reports'),
+    ('day_book', 'account.daybook.report', 'om_account_daily_reports'),
+    ('cash_book', 'account.cashbook.report', 'om_account_daily_reports'),
+    ('bank_book', 'account.bankbook.report', 'om_account_daily_reports'),
+]
+
+# account types of the generated chart of accounts, besides the receivable,
+# payable, bank and cash accounts which are always created once
+BENCHMARK_ACCOUNT_TYPES = [
+    'asset_current', 'asset_non_current', 'asset_fixed', 'liability_current',
+    'liability_non_current', 'equity', 'income', 'income_other', 'expense',
+    'expense_depreciation', 'expense_direct_cost',
+]
+
+
+class AccountReportBenchmark(models.AbstractModel):
+    _name = 'account.report.benchmark'
+    _description = 'Accounting Reports Benchmark'
+
+    # Usage, from `odoo-bin shell -d <database>` on a database dedicated to it:
+    #   company = env['account.report.benchmark']._generate_ledger(move_count=100000)
+    #   env['account.report.benchmark']._run_benchmark(company, output='/tmp/bench.json')
+    # The JSON results of two runs (before and after a change) can then be compared
+    # engine by engine.
+
+    @api.model
+    def _commit(self):
+        if not self.env.registry.in_test_mode():
+            self.env.cr.commit()
+
+    @api.model
+    def _generate_ledger(self, name=BENCHMARK_COMPANY_NAME, account_count=200, partner_count=1000,
+                         move_count=10000, lines_per_move=4, currency_names=('USD', 'EUR', 'GBP'),
+                         reconcile_ratio=0.3, date_from='2023-01-01', days=730, batch_size=500, seed=42):
+        """ Create a company filled with a synthetic ledger: a chart of accounts, partners,
+            sale, purchase, miscellaneous, bank and cash journals, taxes, customer
+            invoices and vendor bills in several currencies, miscellaneous entries, and
+            payments partially reconciled with a share of the invoices.
+
+            The moves are created and posted through the ORM by batches of `batch_size`,
+            each batch being committed, so that the data is the one produced by the
+            accounting rules. The generation is deterministic for a given `seed`.
+
+            Returns the company.
+        """
+        rng = random.Random(seed)
+        date_from = fields.Date.to_date(date_from)
+        currencies = self.env['res.currency'].with_context(active_test=False).search(
+            [('name', 'in', list(currency_names))])
+        if not currencies:
+            raise UserError(_("None of the currencies %s exists.", ', '.join(currency_names)))
+        currencies.active = True
+        company_currency = currencies.filtered(lambda c: c.name == currency_names[0])[:1] or currencies[0]
+        company = self.env['res.company'].create({
+            'name': name,
+            'currency_id': company_currency.id,
+            'country_id': self.env.company.country_id.id or self.env.ref('base.us').id,
+        })
+        self.env.user.company_ids |= company
+        Benchmark = self.with_company(company)
+
+        for currency in currencies - company_currency:
+            Benchmark.env['res.currency.rate'].create({
+                'currency_id': currency.id,
+                'company_id': company.id,
+                'name': date_from,
+                'rate': round(rng.uniform(0.5, 2.0), 4),
+            })
+
+        def create_account(code, account_type, name):
+            return Benchmark.env['account.account'].create({
+                'code': code, 'name': name, 'account_type': account_type,
+                'company_ids': [Command.set(company.ids)],
+            })
+        receivable = create_account('BR1000', 'asset_receivable', 'Benchmark Receivable')
+        payable = create_account('BP2000', 'liability_payable', 'Benchmark Payable')
+        bank = create_account('BB1100', 'asset_cash', 'Benchmark Bank')
+        cash = create_account('BC1200', 'asset_cash', 'Benchmark Cash')
+        accounts = Benchmark.env['account.account'].create([{
+            'code': 'B%05d' % index,
+            'name': 'Benchmark Account %s' % index,
+            'account_type': BENCHMARK_ACCOUNT_TYPES[index % len(BENCHMARK_ACCOUNT_TYPES)],
+            'company_ids': [Command.set(company.ids)],
+        } for index in range(max(account_count - 4, len(BENCHMARK_ACCOUNT_TYPES)))])
+        income_accounts = accounts.filtered(lambda a: a.account_type in ('income', 'income_other'))
+        expense_accounts = accounts.filtered(lambda a: a.account_type.startswith('expense'))
+
+        partners = Benchmark.env['res.partner'].create([
+            {'name': 'Benchmark Partner %s' % index, 'ref': 'BP%06d' % index}
+            for index in range(partner_count)
+        ])
+        partners.write({
+            'property_account_receivable_id': receivable.id,
+            'property_account_payable_id': payable.id,
+        })
+
+        Journal = Benchmark.env['account.journal']
+        journals = {
+            'sale': Journal.create({'name': 'Benchmark Sales', 'code': 'BSAL', 'type': 'sale',
+                                    'default_account_id': income_accounts[:1].id}),
+            'purchase': Journal.create({'name': 'Benchmark Purchases', 'code': 'BPUR', 'type': 'purchase',
+                                        'default_account_id': expense_accounts[:1].id}),
+            'general': Journal.create({'name': 'Benchmark Miscellaneous', 'code': 'BMIS', 'type': 'general'}),
+            'bank': Journal.create({'name': 'Benchmark Bank', 'code': 'BBNK', 'type': 'bank',
+                                    'default_account_id': bank.id}),
+            'cash': Journal.create({'name': 'Benchmark Cash', 'code': 'BCSH', 'type': 'cash',
+                                    'default_account_id': cash.id}),
+        }
+        tax_group = Benchmark.env['account.tax.group'].create({'name': 'Benchmark Taxes', 'company_id': company.id})
+        taxes = {
+            tax_use: Benchmark.env['account.tax'].create({
+                'name': 'Benchmark %s Tax 10%%' % tax_use.capitalize(),
+                'type_tax_use': tax_use,
+                'amount': 10.0,
+                'company_id': company.id,
+                'country_id': company.account_fiscal_country_id.id,
+                'tax_group_id': tax_group.id,
+            })
+            for tax_use in ('sale', 'purchase')
+        }
+        Benchmark._commit()
+
+        def random_date():
+            return date_from + timedelta(days=rng.randrange(days))
+
+        def invoice_vals(move_type):
+            sale = move_type == 'out_invoice'
+            line_accounts = income_accounts if sale else expense_accounts
+            invoice_date = random_date()
+            return {
+                'move_type': move_type,
+                'partner_id': rng.choice(partners).id,
+                'invoice_date': invoice_date,
+                'date': invoice_date,
+                'journal_id': journals['sale' if sale else 'purchase'].id,
+                'currency_id': rng.choice(currencies).id,
+                'invoice_line_ids': [Command.create({
+                    'name': 'Benchmark line',
+                    'account_id': rng.choice(line_accounts).id,
+                    'quantity': rng.randint(1, 10),
+                    'price_unit': round(rng.uniform(1, 1000), 2),
+                    'tax_ids': [Command.set(taxes['sale' if sale else 'purchase'].ids)],
+                }) for dummy in range(max(lines_per_move - 2, 1))],
+            }
+
+        def entry_vals():
+            journal = rng.choice([journals['general'], journals['bank'], journals['cash']])
+            amounts = [round(rng.uniform(1, 5000), 2) for dummy in range(max(lines_per_move - 1, 1))]
+            line_ids = [Command.create({
+                'name': 'Benchmark entry',
+                'account_id': rng.choice(accounts).id,
+                'partner_id': rng.choice(partners).id,
+                'debit': amount,
+                'credit': 0.0,
+            }) for amount in amounts]
+            line_ids.append(Command.create({
+                'name': 'Benchmark counterpart',
+                'account_id': journal.default_account_id.id or rng.choice(accounts).id,
+                'debit': 0.0,
+                'credit': sum(amounts),
+            }))
+            return {'move_type': 'entry', 'journal_id': journal.id, 'date': random_date(), 'line_ids': line_ids}
+
+        Move = Benchmark.env['account.move']
+        for offset in range(0, move_count, batch_size):
+            vals_list = []
+            for dummy in range(min(batch_size, move_count - offset)):
+                kind = rng.random()
+                if kind < 0.4:
+                    vals_list.append(invoice_vals('out_invoice'))
+                elif kind < 0.7:
+                    vals_list.append(invoice_vals('in_invoice'))
+                else:
+                    vals_list.append(entry_vals())
+            moves = Move.create(vals_list)
+            moves.action_post()
+
+            # partial payments of a share of the invoices
+            invoices = moves.filtered(lambda m: m.is_invoice() and rng.random() < reconcile_ratio)
+            payment_vals = []
+            for invoice in invoices:
+                line = invoice.line_ids.filtered(lambda l: l.account_id in receivable | payable)[:1]
+                amount = invoice.company_currency_id.round(line.balance * rng.uniform(0.3, 1.0))
+                payment_vals.append({
+                    'move_type': 'entry',
+                    'journal_id': journals['bank'].id,
+                    'date': invoice.invoice_date + timedelta(days=rng.randrange(60)),
+                    'line_ids': [
+                        Command.create({'name': 'Benchmark payment', 'account_id': line.account_id.id,
+                                        'partner_id': invoice.partner_id.id, 'balance': -amount}),
+                        Command.create({'name': 'Benchmark payment', 'account_id': bank.id, 'balance': amount}),
+                    ],
+                })
+            payments = Move.create(payment_vals)
+            payments.action_post()
+            for invoice, payment in zip(invoices, payments):
+                (invoice.line_ids + payment.line_ids).filtered(
+                    lambda l: l.account_id in receivable | payable).reconcile()
+            Benchmark._commit()
+            Benchmark.env.invalidate_all()
+            _logger.info("Benchmark ledger: %s/%s moves generated", offset + len(moves), move_count)
+        return company
+
+    @api.model
+    def _get_scale(self, company):
+        self.env['account.move.line'].flush_model()
+        self.env.cr.execute("""
+            SELECT COUNT(*), COUNT(DISTINCT partner_id), COUNT(DISTINCT account_id),
+                   COUNT(DISTINCT journal_id), COUNT(DISTINCT currency_id), MIN(date), MAX(date)
+            FROM account_move_line
+            WHERE company_id = %s""", (company.id,))
+        lines, partners, accounts, journals, currencies, date_min, date_max = self.env.cr.fetchone()
+        self.env.cr.execute("""
+            SELECT COUNT(*)
+            FROM account_partial_reconcile
+            WHERE company_id = %s""", (company.id,))
+        return {
+            'move_lines': lines,
+            'partners': partners,
+            'accounts': accounts,
+            'journals': journals,
+            'currencies': currencies,
+            'partial_reconciliations': self.env.cr.fetchone()[0],
+            'date_from': fields.Date.to_string(date_min),
+            'date_to': fields.Date.to_string(date_max),
+        }
+
+    @api.model
+    def _get_wizard_values(self, engine, company, date_from, date_to):
+        journals = self.env['account.journal'].search([('company_id', '=', company.id)])
+        vals = {'date_from': date_from, 'date_to': date_to}
+        if engine == 'general_ledger':
+            vals.update(journal_ids=[Command.set(journals.ids)], initial_balance=True)
+        elif engine in ('trial_balance', 'partner_ledger', 'journal_audit'):
+            vals.update(journal_ids=[Command.set(journals.ids)])
+        elif engine == 'financial_report':
+            vals.update(journal_ids=[Command.set(journals.ids)],
+                        account_report_id=self.env.ref('accounting_pdf_reports.account_financial_report_balancesheet0').id)
+        elif engine == 'aged_balance':
+            vals.update(journal_ids=[Command.set(journals.ids)], date_from=date_to,
+                        result_selection='customer_supplier')
+        elif engine in ('day_book', 'cash_book', 'bank_book'):
+            journal_type = {'day_book': False, 'cash_book': 'cash', 'bank_book': 'bank'}[engine]
+            book_journals = journals.filtered(lambda j: not journal_type or j.type == journal_type)
+            vals.update(journal_ids=[Command.set(journals.ids)],
+                        account_ids=[Command.set(book_journals.default_account_id.ids if journal_type else [])])
+        if engine == 'partner_ledger':
+            vals.update(result_selection='customer_supplier')
+        return vals
+
+    @api.model
+    def _run_engine(self, wizard, trace_memory=True):
+        """ Compute the values of the report of `wizard` as when it is printed, without
+            rendering the template, from cold caches. Returns a dictionary with the
+            duration, the number of queries and the peak of memory allocated by Python.
+        """
+        action = wizard.check_report()
+        # added by the web client to the action of a button, not on the server
+        context = dict(action.get('context') or {}, active_model=wizard._name, active_id=wizard.id)
+        # same serialization as the data sent back by the web client
+        data = json.loads(json.dumps(action.get('data') or {}, default=str))
+        report = self.env['report.%s' % action['report_name']].with_context(context)
+        self.env.flush_all()
+        self.env.invalidate_all()
+        self.env.cr.cache.clear()
+        self.env.registry.clear_cache()
+
+        cr = self.env.cr
+        queries = cr.sql_log_count
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            report._get_report_values(context.get('active_ids') or [], data)
+            duration = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+        return {
+            'seconds': round(duration, 3),
+            'queries': cr.sql_log_count - queries,
+            'peak_memory_kib': peak // 1024 if peak is not None else None,
+        }
+
+    @api.model
+    def _run_benchmark(self, company=None, date_from=False, date_to=False, engines=None, repeat=3,
+                       trace_memory=True, output=None):
+        """ Time the report engines on the ledger of `company` (the generated benchmark
+            company by default) and return the results as a dictionary, also written as
+            JSON to the file `output` when given. Each engine is run `repeat` times and
+            the fastest run is kept; memory is only traced on the first run, as tracing
+            slows down the execution. An engine which fails gets its error as result.
+        """
+        company = company or self.env['res.company'].search([('name', '=', BENCHMARK_COMPANY_NAME)], limit=1)
+        if not company:
+            raise UserError(_("Generate the benchmark ledger first, or give the company to benchmark."))
+        Benchmark = self.with_company(company).with_context(active_model='ir.ui.menu', active_ids=[])
+        scale = Benchmark._get_scale(company)
+        date_from = date_from or scale['date_from']
+        date_to = date_to or scale['date_to']
+        results = {}
+        for engine, model, module in BENCHMARK_ENGINES:
+            if engines and engine not in engines:
+                continue
+            if model not in Benchmark.env:
+                _logger.info("Benchmark: %s skipped, %s is not installed", engine, module)
+                continue
+            try:
+                with Benchmark.env.cr.savepoint():
+                    wizard = Benchmark.env[model].create(
+                        Benchmark._get_wizard_values(engine, company, date_from, date_to))
+                    runs = [Benchmark._run_engine(wizard, trace_memory=trace_memory and not index)
+                            for index in range(max(repeat, 1))]
+            except Exception as e:
+                # a failing engine is recorded, the others still run
+                _logger.exception("Benchmark: %s failed", engine)
+                results[engine] = {'error': str(e)}
+                continue
+            results[engine] = dict(min(runs, key=lambda run: run['seconds']),
+                                   peak_memory_kib=runs[0]['peak_memory_kib'])
+            _logger.info("Benchmark: %s %s", engine, results[engine])
+        res = {
+            'database': Benchmark.env.cr.dbname,
+            'server_version': release.version,
+            'date': fields.Datetime.to_string(fields.Datetime.now()),
+            'company': company.name,
+            'period': {'date_from': fields.Date.to_string(fields.Date.to_date(date_from)),
+                       'date_to': fields.Date.to_string(fields.Date.to_date(date_to))},
+            'scale': scale,
+            'repeat': repeat,
+            'results': results,
+        }
+        if output:
+            with open(output, 'w') as f:
+                json.dump(res, f, indent=2, sort_keys=True)
+        return res
@@ -0,0 +1,185 @@
+import base64
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from odoo import api, models, fields, _
+
+_logger = logging.getLogger(__name__)
+
+# context keys of the report action which are needed to render it again
+REPORT_JOB_CONTEXT_KEYS = ('active_model', 'active_id', 'active_ids', 'landscape', 'lang', 'tz', 'allowed_company_ids')
+
+# a job still running after this delay was interrupted with its worker
+REPORT_JOB_TIMEOUT_MINUTES = 60
+
+
+class AccountReportJob(models.Model):
+    _name = "account.report.job"
+    _description = "Accounting Report Job"
+    _order = "id desc"
+
+    name = fields.Char('Report', required=True, readonly=True)
+    user_id = fields.Many2one('res.users', 'Requested By', required=True, readonly=True,
+                              default=lambda self: self.env.user)
+    company_id = fields.Many2one('res.company', 'Company', required=True, readonly=True,
+                                 default=lambda self: self.env.company)
+    report_name = fields.Char('Report Template', required=True, readonly=True)
+    res_ids = fields.Char('Record IDs', readonly=True)
+    data = fields.Text('Report Data', readonly=True)
+    context = fields.Text('Report Context', readonly=True)
+    data_hash = fields.Char('Request Hash', readonly=True, index=True)
+    fingerprint = fields.Char('Journal Items Fingerprint', readonly=True,
+                              help="State of the journal items when the report was requested, "
+                                   "the result is only reused while it does not change.")
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ], 'Status', required=True, default='queued', readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', 'Report File', readonly=True, ondelete='set null')
+    date_done = fields.Datetime('Generated On', readonly=True)
+    error = fields.Text('Error', readonly=True)
+
+    @api.model
+    def _get_request_hash(self, report_name, res_ids, data, context):
+        request = {
+            'report_name': report_name,
+            'res_ids': res_ids,
+            'data': data,
+            'context': context,
+            'uid': self.env.uid,
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+    @api.model
+    def _get_fingerprint(self, company_ids):
+        fingerprints = self.env['account.move.line']._get_move_lines_fingerprints(company_ids)
+        return json.dumps(sorted(fingerprints.items()), default=str)
+
+    @api.model
+    def _enqueue(self, action):
+        """ Queue the rendering of the report `action` (as returned by report_action)
+            and return a client action: the download of an identical report already
+            generated while no journal item changed since, or a notification telling
+            the user that the report is being generated.
+        """
+        context = action.get('context') or {}
+        context = {key: context[key] for key in REPORT_JOB_CONTEXT_KEYS if key in context}
+        res_ids = context.get('active_ids') or []
+        # same serialization as the data sent back by the web client
+        data = json.loads(json.dumps(action.get('data') or {}, default=str))
+        data_hash = self._get_request_hash(action['report_name'], res_ids, data, context)
+        fingerprint = self._get_fingerprint(context.get('allowed_company_ids') or self.env.companies.ids)
+
+        job = self.search([
+            ('data_hash', '=', data_hash),
+            ('fingerprint', '=', fingerprint),
+            '|', ('state', 'in', ('queued', 'done')),
+            '&', ('state', '=', 'running'), ('write_date', '>=', self._get_stale_date()),
+            ('user_id', '=', self.env.uid),
+        ], limit=1)
+        if job.state == 'done' and job.attachment_id:
+            return job._action_download()
+        if not job:
+            job = self.create({
+                'name': action.get('name') or action['report_name'],
+                'report_name': action['report_name'],
+                'res_ids': json.dumps(res_ids),
+                'data': json.dumps(data),
+                'context': json.dumps(context),
+                'data_hash': data_hash,
+                'fingerprint': fingerprint,
+            })
+            self.env.ref('accounting_pdf_reports.ir_cron_account_report_job')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': _("The report %s is being generated, you will be notified when it is ready.", job.name),
+                'sticky': False,
+            },
+        }
+
+    def _action_download(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % self.attachment_id.id,
+            'target': 'self',
+        }
+
+    def action_download(self):
+        return self._action_download()
+
+    def _render(self):
+        self.ensure_one()
+        context = json.loads(self.context or '{}')
+        report = self.env['ir.actions.report'].with_user(self.user_id).with_company(
+            self.company_id).with_context(**context)
+        content, dummy = report._render_qweb_pdf(
+            self.report_name, json.loads(self.res_ids or '[]'), data=json.loads(self.data or '{}'))
+        self.attachment_id = self.env['ir.attachment'].sudo().create({
+            'name': '%s.pdf' % self.name,
+            'type': 'binary',
+            'datas': base64.b64encode(content),
+            'res_model': self._name,
+            'res_id': self.id,
+            'mimetype': 'application/pdf',
+        })
+
+    def _notify_user(self):
+        self.ensure_one()
+        if self.state == 'done':
+            message = _("The report %s is ready, you can download it from the report jobs.", self.name)
+            notification_type = 'success'
+        else:
+            message = _("The report %s could not be generated.", self.name)
+            notification_type = 'danger'
+        self.env['bus.bus']._sendone(self.user_id.partner_id, 'simple_notification', {
+            'type': notification_type,
+            'message': message,
+            'sticky': True,
+        })
+
+    @api.model
+    def _get_stale_date(self):
+        return fields.Datetime.now() - timedelta(minutes=REPORT_JOB_TIMEOUT_MINUTES)
+
+    @api.model
+    def _fail_stale_jobs(self):
+        """ Mark as failed the jobs left running by a worker which died while
+            rendering them. They are not queued again, as the report itself may be
+            what brought the worker down.
+        """
+        jobs = self.search([('state', '=', 'running'), ('write_date', '<', self._get_stale_date())])
+        if jobs:
+            _logger.warning("Report jobs %s were interrupted, marking them as failed", jobs.ids)
+            jobs.write({'state': 'failed', 'error': _("The generation of the report was interrupted.")})
+            for job in jobs:
+                job._notify_user()
+            self.env.cr.commit()
+
+    @api.model
+    def _cron_render_reports(self, limit=20):
+        """ Render the queued reports one by one, committing after each of them so
+            that a failing report does not prevent the others from being generated.
+        """
+        self._fail_stale_jobs()
+        jobs = self.search([('state', '=', 'queued')], order='id', limit=limit)
+        for job in jobs:
+            job.state = 'running'
+            self.env.cr.commit()
+            try:
+                with self.env.cr.savepoint():
+                    job._render()
+                    job.write({'state': 'done', 'date_done': fields.Datetime.now(), 'error': False})
+            except Exception as e:
+                _logger.exception("Failed to render the report job %s", job.id)
+                job.write({'state': 'failed', 'error': str(e)})
+            job._notify_user()
+            self.env.cr.commit()
+        if len(jobs) == limit:
+            self.env.ref('accounting_pdf_reports.ir_cron_account_report_job')._trigger()
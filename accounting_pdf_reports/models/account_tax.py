@@ -0,0 +1,38 @@
+from odoo import api, models, tools
+
+
+class AccountTax(models.Model):
+    _inherit = "account.tax"
+
+    @api.model
+    @tools.ormcache('company_ids')
+    def _get_tax_report_taxes(self, company_ids):
+        '''Returns a tuple of (tax ID, type of tax use) with the taxes printed on the
+           tax report for the given companies: the sale and purchase taxes, replaced
+           by their children when they are groups. The result is cached until taxes
+           are modified.'''
+        res = []
+        taxes = self.sudo().search([('type_tax_use', '!=', 'none'), ('company_id', 'in', list(company_ids))])
+        for tax in taxes:
+            if tax.children_tax_ids:
+                for child in tax.children_tax_ids:
+                    if child.type_tax_use != 'none':
+                        continue
+                    res.append((child.id, tax.type_tax_use))
+            else:
+                res.append((tax.id, tax.type_tax_use))
+        return tuple(res)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env.registry.clear_cache()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if {'type_tax_use', 'children_tax_ids', 'company_id', 'active', 'amount_type'} & set(vals):
+            self.env.registry.clear_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        self.env.registry.clear_cache()
+        return super().unlink()
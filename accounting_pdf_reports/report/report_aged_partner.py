@@ -231,6 +231,16 @@ class ReportAgedPartnerBalance(models.AbstractModel):
 
         return res, total, lines
 
+    def _get_export_table(self, docids, data):
+        values = self._get_report_values(docids, data)
+        periods = ['4', '3', '2', '1', '0']
+        columns = [_('Partner'), _('Not due')] + [data['form'][period]['name'] for period in periods] + [_('Total')]
+        rows = (
+            [partner['name'], partner['direction']] + [partner[period] for period in periods] + [partner['total']]
+            for partner in values['get_partner_lines']
+        )
+        return columns, rows
+
     @api.model
     def _get_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get('active_model') or not self.env.context.get('active_id'):
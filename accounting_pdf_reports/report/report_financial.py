@@ -19,7 +19,13 @@ class ReportFinancial(models.AbstractModel):
         res = {}
         for account in accounts:
             res[account.id] = dict.fromkeys(mapping, 0.0)
-        if accounts:
+        if accounts and self.env.context.get('consolidation'):
+            # the companies are aggregated separately and merged in the company currency
+            balances = self.env['account.move.line']._get_consolidated_account_balances()
+            for account_id in accounts.ids:
+                if account_id in balances:
+                    res[account_id] = dict(balances[account_id])
+        elif accounts:
             tables, where_clause, where_params = self.env['account.move.line']._query_get()
             tables = tables.replace('"', '') if tables else "account_move_line"
             wheres = [""]
@@ -37,18 +43,25 @@ class ReportFinancial(models.AbstractModel):
                 res[row['id']] = row
         return res
 
-    def _compute_report_balance(self, reports):
+    def _compute_report_balance(self, reports, memo=None):
         '''returns a dictionary with key=the ID of a record and value=the credit, debit and balance amount
-           computed for this record. If the record is of type :
-               'accounts' : it's the sum of the linked accounts
-               'account_type' : it's the sum of leaf accoutns with such an account_type
-               'account_report' : it's the amount of the related report
-               'sum' : it's the sum of the children of this record (aka a 'view' record)'''
+           computed for this record. If the record is of type :
+               'accounts' : it's the sum of the linked accounts
+               'account_type' : it's the sum of leaf accoutns with such an account_type
+               'account_report' : it's the amount of the related report
+               'sum' : it's the sum of the children of this record (aka a 'view' record)
+           `memo` holds the values already computed during this run, so that a report line
+           reached through several parents is only computed once.'''
+        if memo is None:
+            memo = {}
         res = {}
         fields = ['credit', 'debit', 'balance']
         for report in reports:
             if report.id in res:
                 continue
+            if report.id in memo:
+                res[report.id] = memo[report.id]
+                continue
             res[report.id] = dict((fn, 0.0) for fn in fields)
             if report.type == 'accounts':
                 # it's the sum of the linked accounts
@@ -67,16 +80,17 @@ class ReportFinancial(models.AbstractModel):
                         res[report.id][field] += value.get(field)
             elif report.type == 'account_report' and report.account_report_id:
                 # it's the amount of the linked report
-                res2 = self._compute_report_balance(report.account_report_id)
+                res2 = self._compute_report_balance(report.account_report_id, memo)
                 for key, value in res2.items():
                     for field in fields:
                         res[report.id][field] += value[field]
             elif report.type == 'sum':
                 # it's the sum of the children of this account.report
-                res2 = self._compute_report_balance(report.children_ids)
+                res2 = self._compute_report_balance(report.children_ids, memo)
                 for key, value in res2.items():
                     for field in fields:
                         res[report.id][field] += value[field]
+            memo[report.id] = res[report.id]
         return res
 
     def get_account_lines(self, data):
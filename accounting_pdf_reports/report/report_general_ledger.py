@@ -29,50 +29,96 @@ class ReportGeneralLedger(models.AbstractModel):
         }
         """
         cr = self.env.cr
-        MoveLine = self.env['account.move.line']
         move_lines = {x: [] for x in accounts.ids}
 
         # Prepare initial sql query and Get the initial move lines
         if init_balance:
-            context = dict(self.env.context)
-            context['date_from'] = self.env.context.get('date_from')
-            context['date_to'] = False
-            context['initial_bal'] = True
-            if analytic_account_ids:
-                context['analytic_account_ids'] = analytic_account_ids
-            if partner_ids:
-                context['partner_ids'] = partner_ids
-            init_tables, init_where_clause, init_where_params = MoveLine.with_context(context)._query_get()
-            init_wheres = [""]
-            if init_where_clause.strip():
-                init_wheres.append(init_where_clause.strip())
-            init_filters = " AND ".join(init_wheres)
-            filters = init_filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
-            sql = ("""SELECT 0 AS lid, l.account_id AS account_id, '' AS ldate,
-                '' AS lcode, 0.0 AS amount_currency, 
-                '' AS analytic_account_id, '' AS lref, 
-                'Initial Balance' AS lname, COALESCE(SUM(l.debit),0.0) AS debit, 
-                COALESCE(SUM(l.credit),0.0) AS credit, 
-                COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) as balance, 
-                '' AS lpartner_id,\
-                '' AS move_name, '' AS move_id, '' AS currency_code,\
-                NULL AS currency_id,\
-                '' AS invoice_id, '' AS invoice_type, '' AS invoice_number,\
-                '' AS partner_name\
-                FROM account_move_line l\
-                LEFT JOIN account_move m ON (l.move_id=m.id)\
-                LEFT JOIN res_currency c ON (l.currency_id=c.id)\
-                LEFT JOIN res_partner p ON (l.partner_id=p.id)\
-                JOIN account_journal j ON (l.journal_id=j.id)\
-                WHERE l.account_id IN %s""" + filters + ' GROUP BY l.account_id')
-            params = (tuple(accounts.ids),) + tuple(init_where_params)
+            sql, params = self._get_initial_balance_query(accounts, analytic_account_ids, partner_ids)
             cr.execute(sql, params)
             for row in cr.dictfetchall():
                 move_lines[row.pop('account_id')].append(row)
 
+        sql, params = self._get_move_lines_query(accounts, analytic_account_ids, partner_ids, sortby)
+        cr.execute(sql, params)
+
+        for row in cr.dictfetchall():
+            balance = 0
+            for line in move_lines.get(row['account_id']):
+                balance += line['debit'] - line['credit']
+            row['balance'] += balance
+            move_lines[row.pop('account_id')].append(row)
+
+        # Calculate the debit, credit and balance for Accounts
+        account_res = []
+        for account in accounts:
+            currency = account.currency_id and account.currency_id or self.env.company.currency_id
+            res = dict((fn, 0.0) for fn in ['credit', 'debit', 'balance'])
+            res['code'] = account.code
+            res['name'] = account.name
+            res['move_lines'] = move_lines[account.id]
+            for line in res.get('move_lines'):
+                res['debit'] += line['debit']
+                res['credit'] += line['credit']
+                res['balance'] = line['balance']
+            if display_account == 'all':
+                account_res.append(res)
+            if display_account == 'movement' and res.get('move_lines'):
+                account_res.append(res)
+            if display_account == 'not_zero' and not currency.is_zero(res['balance']):
+                account_res.append(res)
+        return account_res
+
+    def _get_initial_balance_query(self, accounts, analytic_account_ids, partner_ids):
+        """ Returns the query and its parameters summing the move lines of every
+            account before the start of the period, as an 'Initial Balance' line.
+        """
+        MoveLine = self.env['account.move.line']
+        context = dict(self.env.context)
+        context['date_from'] = self.env.context.get('date_from')
+        context['date_to'] = False
+        context['initial_bal'] = True
+        if analytic_account_ids:
+            context['analytic_account_ids'] = analytic_account_ids
+        if partner_ids:
+            context['partner_ids'] = partner_ids
+        init_where_clause, init_where_params = MoveLine.with_context(context)._query_get_aliased()
+        init_wheres = [""]
+        if init_where_clause.strip():
+            init_wheres.append(init_where_clause.strip())
+        filters = " AND ".join(init_wheres)
+        sql = ("""SELECT 0 AS lid, l.account_id AS account_id, '' AS ldate,
+            '' AS lcode, 0.0 AS amount_currency, 
+            '' AS analytic_account_id, '' AS lref, 
+            'Initial Balance' AS lname, COALESCE(SUM(l.debit),0.0) AS debit, 
+            COALESCE(SUM(l.credit),0.0) AS credit, 
+            COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) as balance, 
+            '' AS lpartner_id,\
+            '' AS move_name, '' AS move_id, '' AS currency_code,\
+            NULL AS currency_id,\
+            '' AS invoice_id, '' AS invoice_type, '' AS invoice_number,\
+            '' AS partner_name\
+            FROM account_move_line l\
+            LEFT JOIN account_move m ON (l.move_id=m.id)\
+            LEFT JOIN res_currency c ON (l.currency_id=c.id)\
+            LEFT JOIN res_partner p ON (l.partner_id=p.id)\
+            JOIN account_journal j ON (l.journal_id=j.id)\
+            WHERE l.account_id IN %s""" + filters + ' GROUP BY l.account_id')
+        params = (tuple(accounts.ids),) + tuple(init_where_params)
+        return sql, params
+
+    def _get_move_lines_query(self, accounts, analytic_account_ids, partner_ids, sortby, by_account=False):
+        """ Returns the query and its parameters selecting the move lines of the
+            period, sorted by `sortby`, within the order of `accounts` first when
+            `by_account` is set.
+        """
+        MoveLine = self.env['account.move.line']
         sql_sort = 'l.date, l.move_id'
         if sortby == 'sort_journal_partner':
             sql_sort = 'j.code, p.name, l.move_id'
+        order_params = ()
+        if by_account:
+            sql_sort = 'array_position(%s, l.account_id), ' + sql_sort
+            order_params = (list(accounts.ids),)
 
         # Prepare sql query base on selected parameters from wizard
         context = dict(self.env.context)
@@ -80,12 +126,11 @@ class ReportGeneralLedger(models.AbstractModel):
             context['analytic_account_ids'] = analytic_account_ids
         if partner_ids:
             context['partner_ids'] = partner_ids
-        tables, where_clause, where_params = MoveLine.with_context(context)._query_get()
+        where_clause, where_params = MoveLine.with_context(context)._query_get_aliased()
         wheres = [""]
         if where_clause.strip():
             wheres.append(where_clause.strip())
         filters = " AND ".join(wheres)
-        filters = filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
 
         # Get move lines base on sql query and Calculate the total balance of move lines
         sql = ('''SELECT l.id AS lid, l.account_id AS account_id, 
@@ -105,50 +150,72 @@ class ReportGeneralLedger(models.AbstractModel):
             WHERE l.account_id IN %s ''' + filters + ''' GROUP BY l.id, 
             l.account_id, l.date, j.code, l.currency_id, l.amount_currency, 
             l.ref, l.name, m.name, c.symbol, p.name ORDER BY ''' + sql_sort)
-        params = (tuple(accounts.ids),) + tuple(where_params)
-        cr.execute(sql, params)
+        params = (tuple(accounts.ids),) + tuple(where_params) + tuple(order_params)
+        return sql, params
 
-        for row in cr.dictfetchall():
-            balance = 0
-            for line in move_lines.get(row['account_id']):
-                balance += line['debit'] - line['credit']
-            row['balance'] += balance
-            move_lines[row.pop('account_id')].append(row)
+    def _get_export_table(self, docids, data):
+        accounts, analytic_account_ids, partner_ids = self._get_report_filters(data)
+        columns = [_('Account Code'), _('Account'), _('Date'), _('JRNL'), _('Partner'), _('Ref'),
+                   _('Move'), _('Entry Label'), _('Debit'), _('Credit'), _('Balance'),
+                   _('Amount Currency'), _('Currency')]
+        rows = self.with_context(data['form'].get('used_context', {}))._get_export_rows(
+            accounts, analytic_account_ids, partner_ids,
+            data['form'].get('initial_balance', True),
+            data['form'].get('sortby', 'sort_date'),
+            data['form']['display_account'])
+        return columns, rows
 
-        # Calculate the debit, credit and balance for Accounts
-        account_res = []
+    def _get_export_rows(self, accounts, analytic_account_ids, partner_ids,
+                         init_balance, sortby, display_account):
+        """ Yield the rows of the export, the same lines as _get_account_move_entry
+            but read one by one from a server-side cursor, ordered by account,
+            instead of being collected in memory first.
+        """
+        cr = self.env.cr
+        initial = {}
+        if init_balance:
+            sql, params = self._get_initial_balance_query(accounts, analytic_account_ids, partner_ids)
+            cr.execute(sql, params)
+            initial = {row.pop('account_id'): row for row in cr.dictfetchall()}
+        sql, params = self._get_move_lines_query(
+            accounts, analytic_account_ids, partner_ids, sortby, by_account=True)
+        balances = {}
+        if display_account == 'not_zero':
+            cr.execute("SELECT account_id, SUM(debit) - SUM(credit) FROM (" + sql + ") AS lines"
+                       " GROUP BY account_id", params)
+            balances = dict(cr.fetchall())
+
+        lines = self.env['account.report.tabular.export']._stream_query(sql, params)
+        line = next(lines, None)
         for account in accounts:
-            currency = account.currency_id and account.currency_id or self.env.company.currency_id
-            res = dict((fn, 0.0) for fn in ['credit', 'debit', 'balance'])
-            res['code'] = account.code
-            res['name'] = account.name
-            res['move_lines'] = move_lines[account.id]
-            for line in res.get('move_lines'):
-                res['debit'] += line['debit']
-                res['credit'] += line['credit']
-                res['balance'] = line['balance']
-            if display_account == 'all':
-                account_res.append(res)
-            if display_account == 'movement' and res.get('move_lines'):
-                account_res.append(res)
-            if display_account == 'not_zero' and not currency.is_zero(res['balance']):
-                account_res.append(res)
-        return account_res
+            init_line = initial.get(account.id)
+            balance = init_line['balance'] if init_line else 0.0
+            currency = account.currency_id or self.env.company.currency_id
+            displayed = display_account != 'not_zero' or not currency.is_zero(
+                balance + balances.get(account.id, 0.0))
+            if displayed and init_line:
+                yield self._get_export_row(account, init_line)
+            while line is not None and line['account_id'] == account.id:
+                if displayed:
+                    balance += line['debit'] - line['credit']
+                    line['balance'] = balance
+                    yield self._get_export_row(account, line)
+                line = next(lines, None)
 
-    @api.model
-    def _get_report_values(self, docids, data=None):
+    def _get_export_row(self, account, line):
+        return [
+            account.code, account.name, line['ldate'] or None, line['lcode'],
+            line['partner_name'], line['lref'], line['move_name'], line['lname'],
+            line['debit'], line['credit'], line['balance'],
+            line['amount_currency'] if line['currency_id'] else None,
+            line['currency_code'] if line['currency_id'] else None,
+        ]
+
+    def _get_report_filters(self, data):
+        """ Returns the accounts, analytic accounts and partners of the report. """
         if not data.get('form') or not self.env.context.get('active_model'):
             raise UserError(_("Form content is missing, this report cannot be printed."))
         model = self.env.context.get('active_model')
-        docs = self.env[model].browse(self.env.context.get('active_ids', []))
-        init_balance = data['form'].get('initial_balance', True)
-        sortby = data['form'].get('sortby', 'sort_date')
-        display_account = data['form']['display_account']
-        codes = []
-        if data['form'].get('journal_ids', False):
-            codes = [journal.code for journal in
-                     self.env['account.journal'].search(
-                         [('id', 'in', data['form']['journal_ids'])])]
         analytic_account_ids = False
         if data['form'].get('analytic_account_ids', False):
             analytic_account_ids = self.env['account.analytic.account'].search(
@@ -158,12 +225,27 @@ class ReportGeneralLedger(models.AbstractModel):
             partner_ids = self.env['res.partner'].search(
                 [('id', 'in', data['form']['partner_ids'])])
         if model == 'account.account':
-            accounts = docs
+            accounts = self.env[model].browse(self.env.context.get('active_ids', []))
         else:
             domain = []
             if data['form'].get('account_ids', False):
                 domain.append(('id', 'in', data['form']['account_ids']))
             accounts = self.env['account.account'].search(domain)
+        return accounts, analytic_account_ids, partner_ids
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        accounts, analytic_account_ids, partner_ids = self._get_report_filters(data)
+        model = self.env.context.get('active_model')
+        docs = self.env[model].browse(self.env.context.get('active_ids', []))
+        init_balance = data['form'].get('initial_balance', True)
+        sortby = data['form'].get('sortby', 'sort_date')
+        display_account = data['form']['display_account']
+        codes = []
+        if data['form'].get('journal_ids', False):
+            codes = [journal.code for journal in
+                     self.env['account.journal'].search(
+                         [('id', 'in', data['form']['journal_ids'])])]
         accounts_res = self.with_context(
             data['form'].get('used_context', {}))._get_account_move_entry(
             accounts,
@@ -90,6 +90,102 @@ class ReportJournal(models.AbstractModel):
                 res[tax]['tax_amount'] = res[tax]['tax_amount'] * -1
         return res
 
+    def _get_journals_data(self, data):
+        """ Load everything the journal audit template needs for all the selected
+            journals at once: one query for the move lines (with the columns used by
+            the template, totals are summed while reading them) and one grouped query
+            for each of the tax base and tax amounts.
+
+            Returns a tuple of three dictionaries with key=the ID of a journal:
+                `lines`: list of move line values,
+                `totals`: {'debit': sum of debit, 'credit': sum of credit},
+                `taxes`: {tax record: {'base_amount': ..., 'tax_amount': ...}}
+        """
+        journal_ids = data['form']['journal_ids']
+        lines = {journal_id: [] for journal_id in journal_ids}
+        totals = {journal_id: {'debit': 0.0, 'credit': 0.0} for journal_id in journal_ids}
+        taxes = {journal_id: {} for journal_id in journal_ids}
+        if not journal_ids:
+            return lines, totals, taxes
+
+        move_state = ['draft', 'posted']
+        if data['form'].get('target_move', 'all') == 'posted':
+            move_state = ['posted']
+
+        query_get_clause = self._get_query_get_clause(data)
+        params = [tuple(move_state), tuple(journal_ids)] + query_get_clause[2]
+        sort_selection = data['form'].get('sort_selection', 'date')
+        query = """
+            SELECT "account_move_line".id, "account_move_line".journal_id, "account_move_line".move_id,
+                am.name AS move_name, "account_move_line".date, "account_move_line".account_id,
+                p.name AS partner_name, "account_move_line".name, "account_move_line".debit,
+                "account_move_line".credit, "account_move_line".amount_currency, "account_move_line".currency_id
+            FROM """ + query_get_clause[0] + """
+            JOIN account_move am ON ("account_move_line".move_id = am.id)
+            LEFT JOIN res_partner p ON ("account_move_line".partner_id = p.id)
+            WHERE am.state IN %s
+                AND "account_move_line".journal_id IN %s
+                AND """ + query_get_clause[1] + """
+            ORDER BY "account_move_line".journal_id, """
+        if sort_selection == 'date':
+            query += '"account_move_line".date'
+        else:
+            query += 'am.name'
+        query += ', "account_move_line".move_id'
+        self.env.cr.execute(query, tuple(params))
+        rows = self.env.cr.dictfetchall()
+
+        accounts = self.env['account.account'].browse({row['account_id'] for row in rows})
+        account_codes = {account.id: account.code for account in accounts}
+        currency = self.env['res.currency']
+        for row in rows:
+            journal_id = row.pop('journal_id')
+            row['account_code'] = account_codes.get(row['account_id'])
+            row['currency_id'] = currency.browse(row['currency_id'])
+            totals[journal_id]['debit'] += row['debit']
+            totals[journal_id]['credit'] += row['credit']
+            lines[journal_id].append(row)
+
+        query = """
+            SELECT "account_move_line".journal_id, rel.account_tax_id, SUM("account_move_line".balance)
+            FROM """ + query_get_clause[0] + """
+            JOIN account_move_line_account_tax_rel rel ON ("account_move_line".id = rel.account_move_line_id)
+            JOIN account_move am ON ("account_move_line".move_id = am.id)
+            WHERE am.state IN %s
+                AND "account_move_line".journal_id IN %s
+                AND """ + query_get_clause[1] + """
+            GROUP BY "account_move_line".journal_id, rel.account_tax_id"""
+        self.env.cr.execute(query, tuple(params))
+        base_amounts = self.env.cr.fetchall()
+
+        query = """
+            SELECT "account_move_line".journal_id, "account_move_line".tax_line_id, SUM("account_move_line".debit - "account_move_line".credit)
+            FROM """ + query_get_clause[0] + """
+            JOIN account_move am ON ("account_move_line".move_id = am.id)
+            WHERE am.state IN %s
+                AND "account_move_line".journal_id IN %s
+                AND """ + query_get_clause[1] + """
+                AND "account_move_line".tax_line_id IS NOT NULL
+            GROUP BY "account_move_line".journal_id, "account_move_line".tax_line_id"""
+        self.env.cr.execute(query, tuple(params))
+        tax_amounts = {(journal_id, tax_id): amount for journal_id, tax_id, amount in self.env.cr.fetchall()}
+
+        journals = self.env['account.journal'].browse(journal_ids)
+        sale_journal_ids = set(journals.filtered(lambda journal: journal.type == 'sale').ids)
+        tax_records = self.env['account.tax'].browse({tax_id for dummy, tax_id, dummy in base_amounts})
+        tax_records = {tax.id: tax for tax in tax_records}
+        for journal_id, tax_id, base_amount in base_amounts:
+            tax_amount = tax_amounts.get((journal_id, tax_id)) or 0.0
+            if journal_id in sale_journal_ids:
+                #sales operation are credits
+                base_amount = base_amount * -1
+                tax_amount = tax_amount * -1
+            taxes[journal_id][tax_records[tax_id]] = {
+                'base_amount': base_amount,
+                'tax_amount': tax_amount,
+            }
+        return lines, totals, taxes
+
     def _get_query_get_clause(self, data):
         return self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
 
@@ -98,19 +194,16 @@ class ReportJournal(models.AbstractModel):
         if not data.get('form'):
             raise UserError(_("Form content is missing, this report cannot be printed."))
 
-        target_move = data['form'].get('target_move', 'all')
-        sort_selection = data['form'].get('sort_selection', 'date')
-
-        res = {}
-        for journal in data['form']['journal_ids']:
-            res[journal] = self.with_context(data['form'].get('used_context', {})).lines(target_move, journal, sort_selection, data)
+        lines, totals, taxes = self.with_context(data['form'].get('used_context', {}))._get_journals_data(data)
         return {
             'doc_ids': data['form']['journal_ids'],
             'doc_model': self.env['account.journal'],
             'data': data,
             'docs': self.env['account.journal'].browse(data['form']['journal_ids']),
             'time': time,
-            'lines': res,
+            'lines': lines,
+            'totals': totals,
+            'journal_taxes': taxes,
             'sum_credit': self._sum_credit,
             'sum_debit': self._sum_debit,
             'get_taxes': self._get_taxes,
@@ -7,72 +7,108 @@ class ReportPartnerLedger(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_partnerledger'
     _description = 'Partner Ledger Report'
 
-    def _lines(self, data, partner):
-        full_account = []
+    def _get_partners_lines(self, data, partners):
+        """ Fetch the move lines of all the given partners with a single query and
+            compute their running balance and totals in one pass.
+
+            Returns a dictionary with key=the ID of a partner and value={
+                'lines': list of move lines, each with its 'progress' balance,
+                'debit': sum of debit,
+                'credit': sum of credit,
+                'balance': sum of debit - credit,
+            }
+        """
+        result = {
+            partner.id: {'lines': [], 'debit': 0.0, 'credit': 0.0, 'balance': 0.0}
+            for partner in partners
+        }
+        if not result:
+            return result
         currency = self.env['res.currency']
+        query, params = self._get_partners_lines_query(data, list(result))
+        self.env.cr.execute(query, params)
+        for r in self.env.cr.dictfetchall():
+            partner_res = result[r.pop('partner_id')]
+            self._set_displayed_name(r)
+            partner_res['debit'] += r['debit']
+            partner_res['credit'] += r['credit']
+            partner_res['balance'] += r['debit'] - r['credit']
+            r['progress'] = partner_res['balance']
+            r['currency_id'] = currency.browse(r.get('currency_id'))
+            partner_res['lines'].append(r)
+        return result
+
+    def _get_partners_lines_query(self, data, partner_ids):
+        """ Returns the query and its parameters selecting the move lines of the
+            partners, ordered as `partner_ids` then by date.
+        """
         query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
         reconcile_clause = "" if data['form']['reconciled'] else ' AND "account_move_line".full_reconcile_id IS NULL '
-        params = [partner.id, tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + query_get_data[2]
+        params = [tuple(partner_ids), tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + query_get_data[2] + [partner_ids]
         query = """
-            SELECT "account_move_line".id, "account_move_line".date, j.code, acc.name->>'en_US' as a_name, "account_move_line".ref, m.name as move_name, "account_move_line".name, "account_move_line".debit, "account_move_line".credit, "account_move_line".amount_currency,"account_move_line".currency_id, c.symbol AS currency_code
+            SELECT "account_move_line".id, "account_move_line".partner_id, "account_move_line".date, j.code, acc.name->>'en_US' as a_name, "account_move_line".ref, m.name as move_name, "account_move_line".name, "account_move_line".debit, "account_move_line".credit, "account_move_line".amount_currency,"account_move_line".currency_id, c.symbol AS currency_code
             FROM """ + query_get_data[0] + """
             LEFT JOIN account_journal j ON ("account_move_line".journal_id = j.id)
             LEFT JOIN account_account acc ON ("account_move_line".account_id = acc.id)
             LEFT JOIN res_currency c ON ("account_move_line".currency_id=c.id)
             LEFT JOIN account_move m ON (m.id="account_move_line".move_id)
-            WHERE "account_move_line".partner_id = %s
+            WHERE "account_move_line".partner_id IN %s
                 AND m.state IN %s
                 AND "account_move_line".account_id IN %s AND """ + query_get_data[1] + reconcile_clause + """
-                ORDER BY "account_move_line".date"""
-        self.env.cr.execute(query, tuple(params))
-        res = self.env.cr.dictfetchall()
-        sum = 0.0
-        lang_code = self.env.context.get('lang') or 'en_US'
-        lang = self.env['res.lang']
-        lang_id = lang._lang_get(lang_code)
-        date_format = lang_id.date_format
-        for r in res:
-            r['date'] = r['date']
-            r['displayed_name'] = '-'.join(
-                r[field_name] for field_name in ('move_name', 'ref', 'name')
-                if r[field_name] not in (None, '', '/')
-            )
-            sum += r['debit'] - r['credit']
-            r['progress'] = sum
-            r['currency_id'] = currency.browse(r.get('currency_id'))
-            full_account.append(r)
-        return full_account
+                ORDER BY array_position(%s, "account_move_line".partner_id), "account_move_line".date, "account_move_line".id"""
+        return query, tuple(params)
+
+    def _set_displayed_name(self, line):
+        line['displayed_name'] = '-'.join(
+            line[field_name] for field_name in ('move_name', 'ref', 'name')
+            if line[field_name] not in (None, '', '/')
+        )
+
+    def _lines(self, data, partner):
+        return self._get_partners_lines(data, partner)[partner.id]['lines']
 
     def _sum_partner(self, data, partner, field):
         if field not in ['debit', 'credit', 'debit - credit']:
             return
-        result = 0.0
-        query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
-        reconcile_clause = "" if data['form']['reconciled'] else ' AND "account_move_line".full_reconcile_id IS NULL '
+        if field == 'debit - credit':
+            field = 'balance'
+        return self._get_partners_lines(data, partner)[partner.id][field]
 
-        params = [partner.id, tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + query_get_data[2]
-        query = """SELECT sum(""" + field + """)
-                FROM """ + query_get_data[0] + """, account_move AS m
-                WHERE "account_move_line".partner_id = %s
-                    AND m.id = "account_move_line".move_id
-                    AND m.state IN %s
-                    AND account_id IN %s
-                    AND """ + query_get_data[1] + reconcile_clause
-        self.env.cr.execute(query, tuple(params))
-
-        contemp = self.env.cr.fetchone()
-        if contemp is not None:
-            result = contemp[0] or 0.0
-        return result
-
-    @api.model
-    def _get_report_values(self, docids, data=None):
+    def _get_export_table(self, docids, data):
         if not data.get('form'):
             raise UserError(_("Form content is missing, this report cannot be printed."))
-        data['computed'] = {}
+        partners = self.env['res.partner'].browse(self._get_partner_ids(data))
+        partners = sorted(partners, key=lambda x: (x.ref or '', x.name or ''))
+        columns = [_('Partner Ref'), _('Partner'), _('Date'), _('JRNL'), _('Account'), _('Ref'),
+                   _('Debit'), _('Credit'), _('Balance'), _('Amount Currency'), _('Currency')]
+        return columns, self._get_export_rows(data, partners)
 
-        obj_partner = self.env['res.partner']
-        query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
+    def _get_export_rows(self, data, partners):
+        """ Yield the rows of the export, the same lines as _get_partners_lines but
+            read one by one from a server-side cursor instead of being collected in
+            memory first.
+        """
+        if not partners:
+            return
+        partners = {partner.id: partner for partner in partners}
+        query, params = self._get_partners_lines_query(data, list(partners))
+        partner_id = balance = None
+        for line in self.env['account.report.tabular.export']._stream_query(query, params):
+            if line['partner_id'] != partner_id:
+                partner_id, balance = line['partner_id'], 0.0
+            partner = partners[partner_id]
+            self._set_displayed_name(line)
+            balance += line['debit'] - line['credit']
+            yield [
+                partner.ref, partner.name, line['date'], line['code'], line['a_name'],
+                line['displayed_name'], line['debit'], line['credit'], balance,
+                line['amount_currency'] if line['currency_id'] else None,
+                line['currency_code'] if line['currency_id'] else None,
+            ]
+
+    def _compute_report_scope(self, data):
+        """ Store the move states and the accounts of the report in data['computed']. """
+        data['computed'] = {}
         data['computed']['move_state'] = ['draft', 'posted']
         if data['form'].get('target_move', 'all') == 'posted':
             data['computed']['move_state'] = ['posted']
@@ -90,6 +126,13 @@ class ReportPartnerLedger(models.AbstractModel):
             WHERE a.account_type IN %s
             AND NOT a.deprecated""", (tuple(data['computed']['ACCOUNT_TYPE']),))
         data['computed']['account_ids'] = [a for (a,) in self.env.cr.fetchall()]
+
+    def _get_partner_ids(self, data):
+        """ Compute the scope of the report and return the IDs of the partners to print. """
+        self._compute_report_scope(data)
+        if data['form']['partner_ids']:
+            return data['form']['partner_ids']
+        query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
         params = [tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + query_get_data[2]
         reconcile_clause = "" if data['form']['reconciled'] else ' AND "account_move_line".full_reconcile_id IS NULL '
         query = """
@@ -103,12 +146,15 @@ class ReportPartnerLedger(models.AbstractModel):
                 AND NOT account.deprecated
                 AND """ + query_get_data[1] + reconcile_clause
         self.env.cr.execute(query, tuple(params))
-        if data['form']['partner_ids']:
-            partner_ids = data['form']['partner_ids']
-        else:
-            partner_ids = [res['partner_id'] for res in
-                           self.env.cr.dictfetchall()]
-        partners = obj_partner.browse(partner_ids)
+        return [res['partner_id'] for res in self.env.cr.dictfetchall()]
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        if not data.get('form'):
+            raise UserError(_("Form content is missing, this report cannot be printed."))
+        partner_ids = self._get_partner_ids(data)
+        partners = self.env['res.partner'].browse(partner_ids)
+        partners_lines = self._get_partners_lines(data, partners)
         partners = sorted(partners, key=lambda x: (x.ref or '', x.name or ''))
 
         return {
@@ -117,6 +163,7 @@ class ReportPartnerLedger(models.AbstractModel):
             'data': data,
             'docs': partners,
             'time': time,
+            'partners_lines': partners_lines,
             'lines': self._lines,
             'sum_partner': self._sum_partner,
         }
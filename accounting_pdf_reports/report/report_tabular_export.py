@@ -0,0 +1,90 @@
+import csv
+import datetime
+import io
+import json
+import tempfile
+import uuid
+import xlsxwriter
+from odoo import api, models, _
+from odoo.exceptions import UserError
+
+# number of rows read at once from the server-side cursors of the exports
+EXPORT_FETCH_SIZE = 2000
+
+
+class AccountReportTabularExport(models.AbstractModel):
+    _name = 'account.report.tabular.export'
+    _description = 'Accounting Report Tabular Export'
+
+    @api.model
+    def _export(self, action, file_format):
+        """ Export the report of `action` (as returned by report_action) as a CSV or
+            XLSX file, without rendering its QWeb template.
+
+            The report model provides the rows through `_get_export_table`, reusing its
+            queries; the ledgers yield them as they are read from a server-side cursor
+            (see `_stream_query`). They are written one by one to a temporary file
+            (XLSX in constant memory mode) which is streamed to the client.
+
+            Returns a tuple (file object, file name, mimetype).
+        """
+        report = self.env['report.%s' % action['report_name']]
+        if not hasattr(report, '_get_export_table'):
+            raise UserError(_("The report %s cannot be exported.", action.get('name') or action['report_name']))
+        context = action.get('context') or {}
+        # same serialization as the data sent back by the web client
+        data = json.loads(json.dumps(action.get('data') or {}, default=str))
+        columns, rows = report.with_context(context)._get_export_table(context.get('active_ids') or [], data)
+
+        output = tempfile.TemporaryFile()
+        if file_format == 'csv':
+            self._write_csv(output, columns, rows)
+            mimetype = 'text/csv'
+        elif file_format == 'xlsx':
+            self._write_xlsx(output, columns, rows, action.get('name'))
+            mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        else:
+            output.close()
+            raise UserError(_("Unsupported export format: %s", file_format))
+        output.seek(0)
+        filename = '%s.%s' % (action.get('name') or action['report_name'], file_format)
+        return output, filename, mimetype
+
+    @api.model
+    def _stream_query(self, query, params=None):
+        """ Yield the rows of `query` as dictionaries, read by batches of
+            EXPORT_FETCH_SIZE from a server-side cursor opened in the transaction of
+            the environment, so that the whole result is never held in memory.
+        """
+        self.env.flush_all()
+        name = 'account_report_export_%s' % uuid.uuid4().hex
+        with self.env.cr._cnx.cursor(name) as cursor:
+            cursor.itersize = EXPORT_FETCH_SIZE
+            cursor.execute(query, params)
+            columns = None
+            for row in cursor:
+                if columns is None:
+                    columns = [description[0] for description in cursor.description]
+                yield dict(zip(columns, row))
+
+    def _write_csv(self, output, columns, rows):
+        stream = io.TextIOWrapper(output, encoding='utf-8', newline='', write_through=True)
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+        stream.detach()
+
+    def _write_xlsx(self, output, columns, rows, sheet_name):
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        sheet = workbook.add_worksheet((sheet_name or 'Report')[:31])
+        header_format = workbook.add_format({'bold': True})
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        sheet.write_row(0, 0, columns, header_format)
+        for row_index, row in enumerate(rows, 1):
+            for col_index, value in enumerate(row):
+                if isinstance(value, datetime.date):
+                    sheet.write_datetime(row_index, col_index, value, date_format)
+                elif value is not None:
+                    sheet.write(row_index, col_index, value)
+        workbook.close()
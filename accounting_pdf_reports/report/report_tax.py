@@ -1,4 +1,4 @@
-from odoo import api, models, _
+from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 
 
@@ -12,59 +12,81 @@ class ReportTax(models.AbstractModel):
             raise UserError(_("Form content is missing, this report cannot be printed."))
         return {
             'data': data['form'],
+            'periods': self._get_periods(data['form']),
             'lines': self.get_lines(data.get('form')),
         }
 
-    def _sql_from_amls_one(self):
-        sql = """SELECT "account_move_line".tax_line_id, COALESCE(SUM("account_move_line".debit-"account_move_line".credit), 0)
-                    FROM %s
-                    WHERE %s GROUP BY "account_move_line".tax_line_id"""
-        return sql
+    @api.model
+    def _get_periods(self, options):
+        """ Returns the periods of the report, the selected one first, as a list of
+            dictionaries {'name', 'date_from', 'date_to'}.
+        """
+        periods = options.get('periods') or [{
+            'name': '', 'date_from': options['date_from'], 'date_to': options['date_to'],
+        }]
+        return [dict(period,
+                     date_from=fields.Date.to_date(period['date_from']),
+                     date_to=fields.Date.to_date(period['date_to']))
+                for period in periods]
 
-    def _sql_from_amls_two(self):
-        sql = """SELECT r.account_tax_id, COALESCE(SUM("account_move_line".debit-"account_move_line".credit), 0)
-                 FROM %s
-                 INNER JOIN account_move_line_account_tax_rel r ON ("account_move_line".id = r.account_move_line_id)
-                 INNER JOIN account_tax t ON (r.account_tax_id = t.id)
-                 WHERE %s GROUP BY r.account_tax_id"""
-        return sql
+    def _sql_from_amls(self, tables, where_clause, periods):
+        """ Tax amounts (move lines having the tax as tax_line_id) and net amounts
+            (move lines having the tax in tax_ids) of every tax and period, computed
+            in a single scan of the move lines.
+        """
+        period_case = " ".join(
+            'WHEN "account_move_line".date BETWEEN %s AND %s THEN ' + str(index)
+            for index in range(len(periods)))
+        return """
+            SELECT x.tax_id,
+                   CASE """ + period_case + """ END AS period,
+                   COALESCE(SUM(CASE WHEN x.is_tax THEN "account_move_line".debit - "account_move_line".credit END), 0),
+                   COALESCE(SUM(CASE WHEN NOT x.is_tax THEN "account_move_line".debit - "account_move_line".credit END), 0)
+            FROM """ + tables + """
+            CROSS JOIN LATERAL (
+                SELECT "account_move_line".tax_line_id, TRUE
+                WHERE "account_move_line".tax_line_id IS NOT NULL
+                UNION ALL
+                SELECT r.account_tax_id, FALSE
+                FROM account_move_line_account_tax_rel r
+                WHERE r.account_move_line_id = "account_move_line".id
+            ) AS x(tax_id, is_tax)
+            WHERE """ + where_clause + """
+            GROUP BY x.tax_id, period"""
 
     def _compute_from_amls(self, options, taxes):
-        #compute the tax amount
-        sql = self._sql_from_amls_one()
-        tables, where_clause, where_params = self.env['account.move.line']._query_get()
-        query = sql % (tables, where_clause)
-        self.env.cr.execute(query, where_params)
-        results = self.env.cr.fetchall()
-        for result in results:
-            if result[0] in taxes:
-                taxes[result[0]]['tax'] = abs(result[1])
-
-        #compute the net amount
-        sql2 = self._sql_from_amls_two()
-        query = sql2 % (tables, where_clause)
-        self.env.cr.execute(query, where_params)
-        results = self.env.cr.fetchall()
-        for result in results:
-            if result[0] in taxes:
-                taxes[result[0]]['net'] = abs(result[1])
+        periods = self._get_periods(options)
+        tables, where_clause, where_params = self.env['account.move.line'].with_context(
+            date_from=min(period['date_from'] for period in periods),
+            date_to=max(period['date_to'] for period in periods),
+        )._query_get()
+        params = [date for period in periods for date in (period['date_from'], period['date_to'])]
+        self.env.cr.execute(self._sql_from_amls(tables, where_clause, periods), params + where_params)
+        for tax_id, period, tax_amount, net_amount in self.env.cr.fetchall():
+            if tax_id in taxes and period is not None:
+                taxes[tax_id]['periods'][period] = {'tax': abs(tax_amount), 'net': abs(net_amount)}
+        for tax in taxes.values():
+            tax.update(tax['periods'][0])
 
     @api.model
     def get_lines(self, options):
-        taxes = {}
-        for tax in self.env['account.tax'].search([('type_tax_use', '!=', 'none')]):
-            if tax.children_tax_ids:
-                for child in tax.children_tax_ids:
-                    if child.type_tax_use != 'none':
-                        continue
-                    taxes[child.id] = {'tax': 0, 'net': 0, 'name': child.name, 'type': tax.type_tax_use}
-            else:
-                taxes[tax.id] = {'tax': 0, 'net': 0, 'name': tax.name, 'type': tax.type_tax_use}
-        self.with_context(date_from=options['date_from'], date_to=options['date_to'],
-                          state=options['target_move'],
-                          strict_range=True)._compute_from_amls(options, taxes)
+        """ Returns the lines of the tax report grouped by type of tax use:
+            {'sale': [...], 'purchase': [...]}, each line having the tax and net
+            amounts of the first period as 'tax' and 'net', and those of every
+            period in 'periods'.
+        """
+        period_count = len(self._get_periods(options))
+        tax_types = dict(self.env['account.tax']._get_tax_report_taxes(tuple(self.env.companies.ids)))
+        taxes = {
+            tax.id: {
+                'tax': 0, 'net': 0, 'name': tax.name, 'type': tax_types[tax.id],
+                'periods': [{'tax': 0, 'net': 0} for dummy in range(period_count)],
+            }
+            for tax in self.env['account.tax'].browse(list(tax_types))
+        }
+        self.with_context(state=options['target_move'], strict_range=True)._compute_from_amls(options, taxes)
         groups = dict((tp, []) for tp in ['sale', 'purchase'])
         for tax in taxes.values():
-            if tax['tax']:
+            if any(period['tax'] for period in tax['periods']):
                 groups[tax['type']].append(tax)
         return groups
@@ -1,28 +1,42 @@
 import time
 from odoo import api, models, _
 from odoo.exceptions import UserError
+from odoo.tools import float_is_zero
 
 
 class ReportTrialBalance(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_trialbalance'
     _description = 'Trial Balance Report'
 
-    def _get_accounts(self, accounts, display_account):
-        """ compute the balance, debit and credit for the provided accounts
-            :Arguments:
-                `accounts`: list of accounts record,
-                `display_account`: it's used to display either all accounts or those accounts which balance is > 0
-            :Returns a list of dictionary of Accounts with following key and value
-                `name`: Account name,
-                `code`: Account code,
-                `credit`: total amount of credit,
-                `debit`: total amount of debit,
-                `balance`: total amount of balance,
+    def _get_account_balances(self, accounts):
+        """ compute in a single query, for the provided accounts, the debit, credit and
+            balance of the report and, with the `opening_closing` context key, the
+            opening balance (before the start date) and the closing balance. Returns a
+            dictionary with key=the ID of an account.
         """
-
         account_result = {}
+        opening_closing = self.env.context.get('opening_closing')
+        if self.env.context.get('consolidation'):
+            if opening_closing:
+                raise UserError(_("The opening and closing balances cannot be computed for a consolidation."))
+            # the companies are aggregated separately and merged in the company currency
+            balances = self.env['account.move.line']._get_consolidated_account_balances()
+            for account_id in accounts.ids:
+                if account_id in balances:
+                    account_result[account_id] = dict(
+                        balances[account_id], opening=0.0, closing=balances[account_id]['balance'])
+            return account_result
+
+        date_from = self.env.context.get('date_from')
+        opening_closing = opening_closing and date_from
+        MoveLine = self.env['account.move.line']
+        if opening_closing:
+            # the lines before the start date make the opening balance of the
+            # accounts bringing their balance forward, as the initial balance of the
+            # general ledger
+            MoveLine = MoveLine.with_context(date_from=False)
         # Prepare sql query base on selected parameters from wizard
-        tables, where_clause, where_params = self.env['account.move.line']._query_get()
+        tables, where_clause, where_params = MoveLine._query_get()
         tables = tables.replace('"','')
         if not tables:
             tables = 'account_move_line'
@@ -30,33 +44,135 @@ class ReportTrialBalance(models.AbstractModel):
         if where_clause.strip():
             wheres.append(where_clause.strip())
         filters = " AND ".join(wheres)
-        # compute the balance, debit and credit for the provided accounts
-        request = ("SELECT account_id AS id, SUM(debit) AS debit, SUM(credit) AS credit, "
-                   "(SUM(debit) - SUM(credit)) AS balance" +\
+        if opening_closing:
+            forward_account_ids = accounts.filtered('include_initial_balance').ids
+            columns = ("COALESCE(SUM(CASE WHEN account_move_line.date < %s THEN debit - credit END), 0) AS opening, "
+                       "COALESCE(SUM(CASE WHEN account_move_line.date >= %s THEN debit END), 0) AS debit, "
+                       "COALESCE(SUM(CASE WHEN account_move_line.date >= %s THEN credit END), 0) AS credit")
+            params = (date_from, date_from, date_from)
+            filters += " AND (account_move_line.date >= %s OR account_id = ANY(%s))"
+            where_params = list(where_params) + [date_from, forward_account_ids]
+        else:
+            columns = "0.0 AS opening, SUM(debit) AS debit, SUM(credit) AS credit"
+            params = ()
+        request = ("SELECT account_id AS id, " + columns +
                    " FROM " + tables + " WHERE account_id IN %s " + filters + " GROUP BY account_id")
-        params = (tuple(accounts.ids),) + tuple(where_params)
+        params += (tuple(accounts.ids),) + tuple(where_params)
         self.env.cr.execute(request, params)
         for row in self.env.cr.dictfetchall():
+            row['balance'] = row['debit'] - row['credit']
+            row['closing'] = row['opening'] + row['balance']
             account_result[row.pop('id')] = row
+        return account_result
 
+    def _get_accounts(self, accounts, display_account):
+        """ compute the balance, debit and credit for the provided accounts
+            :Arguments:
+                `accounts`: list of accounts record,
+                `display_account`: it's used to display either all accounts or those accounts which balance is > 0
+            :Returns a list of dictionary of Accounts with following key and value
+                `name`: Account name,
+                `code`: Account code,
+                `credit`: total amount of credit,
+                `debit`: total amount of debit,
+                `balance`: total amount of balance,
+                `opening`: balance before the start date,
+                `closing`: balance at the end date,
+        """
+        account_result = self._get_account_balances(accounts)
+        fields = ['credit', 'debit', 'balance', 'opening', 'closing']
+        company_rounding = self.env.company.currency_id.rounding
         account_res = []
         for account in accounts:
-            res = dict((fn, 0.0) for fn in ['credit', 'debit', 'balance'])
-            currency = account.currency_id and account.currency_id or self.env.company.currency_id
+            res = dict((fn, 0.0) for fn in fields)
+            rounding = account.currency_id.rounding or company_rounding
+            res['id'] = account.id
             res['code'] = account.code
             res['name'] = account.name
             if account.id in account_result:
-                res['debit'] = account_result[account.id].get('debit')
-                res['credit'] = account_result[account.id].get('credit')
-                res['balance'] = account_result[account.id].get('balance')
+                for field in fields:
+                    res[field] = account_result[account.id][field]
             if display_account == 'all':
                 account_res.append(res)
-            if display_account == 'not_zero' and not currency.is_zero(res['balance']):
+            elif display_account == 'not_zero' and not float_is_zero(res['balance'], precision_rounding=rounding):
                 account_res.append(res)
-            if display_account == 'movement' and (not currency.is_zero(res['debit']) or not currency.is_zero(res['credit'])):
+            elif display_account == 'movement' and (
+                    not float_is_zero(res['debit'], precision_rounding=rounding)
+                    or not float_is_zero(res['credit'], precision_rounding=rounding)):
                 account_res.append(res)
         return account_res
 
+    def _get_hierarchy_lines(self, account_lines):
+        """ fold the account lines into their account groups, up to the root groups,
+            and return the flattened tree: each group line is followed by its sub-groups
+            and accounts, ordered by code. The amounts of a group are the sum of all the
+            accounts below it.
+            :Arguments:
+                `account_lines`: the lines returned by _get_accounts
+        """
+        fields = ['credit', 'debit', 'balance', 'opening', 'closing']
+        accounts = self.env['account.account'].browse([line['id'] for line in account_lines])
+        group_by_account = {account.id: account.group_id for account in accounts}
+        nodes = {}
+        roots = []
+
+        def get_node(group):
+            if group.id not in nodes:
+                node = dict((fn, 0.0) for fn in fields)
+                node.update({
+                    'type': 'group',
+                    'id': group.id,
+                    'code': group.code_prefix_start,
+                    'name': group.name,
+                    'parent_id': group.parent_id.id,
+                    'children': [],
+                })
+                nodes[group.id] = node
+                if group.parent_id:
+                    get_node(group.parent_id)['children'].append(node)
+                else:
+                    roots.append(node)
+            return nodes[group.id]
+
+        for line in account_lines:
+            line = dict(line, type='account', children=[])
+            group = group_by_account[line['id']]
+            if not group:
+                roots.append(line)
+                continue
+            node = get_node(group)
+            node['children'].append(line)
+            while node:
+                for field in fields:
+                    node[field] += line[field]
+                node = nodes.get(node['parent_id'])
+
+        def flatten(lines, level):
+            for line in sorted(lines, key=lambda line: (line['type'] == 'account', line['code'] or '')):
+                line['level'] = level
+                res.append(line)
+                flatten(line['children'], level + 1)
+
+        res = []
+        flatten(roots, 0)
+        for line in res:
+            del line['children']
+        return res
+
+    def _get_export_table(self, docids, data):
+        values = self._get_report_values(docids, data)
+        if data['form'].get('opening_closing'):
+            columns = [_('Code'), _('Account'), _('Opening'), _('Debit'), _('Credit'), _('Balance'), _('Closing')]
+            fields = ['opening', 'debit', 'credit', 'balance', 'closing']
+        else:
+            columns = [_('Code'), _('Account'), _('Debit'), _('Credit'), _('Balance')]
+            fields = ['debit', 'credit', 'balance']
+        rows = (
+            [account['code'], account['name']] + [account[field] for field in fields]
+            for account in values['Accounts']
+        )
+        return columns, rows
+
     @api.model
     def _get_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get('active_model'):
@@ -72,7 +188,10 @@ class ReportTrialBalance(models.AbstractModel):
             analytic_account_ids = self.env['account.analytic.account'].browse(data['form'].get('analytic_account_ids'))
             context['analytic_account_ids'] = analytic_account_ids
             analytic_accounts = [account.name for account in analytic_account_ids]
-        account_res = self.with_context(context)._get_accounts(accounts, display_account)
+        account_res = self.with_context(context, opening_closing=data['form'].get('opening_closing'))._get_accounts(
+            accounts, display_account)
+        if data['form'].get('hierarchy'):
+            account_res = self._get_hierarchy_lines(account_res)
         codes = []
         if data['form'].get('journal_ids', False):
             codes = [journal.code for journal in
@@ -0,0 +1,92 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { formatDate, deserializeDate } from "@web/core/l10n/dates";
+import { formatMonetary } from "@web/views/fields/formatters";
+
+/**
+ * Interactive general/partner ledger: the sections (accounts or partners) are
+ * loaded with their totals, the move lines of a section are only fetched when
+ * it is unfolded, one page at a time.
+ */
+export class LedgerBrowser extends Component {
+    static template = "accounting_pdf_reports.LedgerBrowser";
+    static props = ["*"];
+
+    setup() {
+        this.orm = useService("orm");
+        this.actionService = useService("action");
+        const params = this.props.action.params || {};
+        this.model = params.model;
+        this.wizardId = params.wizard_id;
+        this.state = useState({
+            title: "",
+            currencyId: false,
+            sections: [],
+            // {section_id: {lines, cursor, loading}}
+            pages: {},
+        });
+        onWillStart(() => this.loadSections());
+    }
+
+    async loadSections() {
+        const result = await this.orm.call("account.ledger.browser", "get_sections", [
+            this.model,
+            this.wizardId,
+        ]);
+        this.state.title = result.title;
+        this.state.currencyId = result.currency_id;
+        this.state.sections = result.sections;
+    }
+
+    async loadLines(section) {
+        const page = this.state.pages[section.id];
+        if (page.loading || !page.cursor) {
+            return;
+        }
+        page.loading = true;
+        try {
+            const result = await this.orm.call("account.ledger.browser", "get_lines", [
+                this.model,
+                this.wizardId,
+                section.id,
+                page.cursor,
+            ]);
+            page.lines.push(...result.lines);
+            page.cursor = result.cursor;
+        } finally {
+            page.loading = false;
+        }
+    }
+
+    async toggleSection(section) {
+        if (this.state.pages[section.id]) {
+            delete this.state.pages[section.id];
+            return;
+        }
+        this.state.pages[section.id] = { lines: [], cursor: section.cursor, loading: false };
+        await this.loadLines(section);
+    }
+
+    openMove(line) {
+        this.actionService.doAction({
+            type: "ir.actions.act_window",
+            res_model: "account.move",
+            res_id: line.move_id,
+            views: [[false, "form"]],
+            target: "current",
+        });
+    }
+
+    formatAmount(value) {
+        return formatMonetary(value, { currencyId: this.state.currencyId });
+    }
+
+    formatDate(value) {
+        return value ? formatDate(deserializeDate(value)) : "";
+    }
+}
+
+registry.category("actions").add("accounting_pdf_reports.ledger_browser", LedgerBrowser);
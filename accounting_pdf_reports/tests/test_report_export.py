@@ -0,0 +1,47 @@
+import csv
+import io
+
+from odoo import fields
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestReportExport(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.invoice = cls.init_invoice('out_invoice', partners=cls.partner_a, amounts=[1000.0],
+                                       invoice_date=fields.Date.today(), post=True)
+
+    def _export(self, model, vals=None):
+        wizard = self.env[model].create(dict({
+            'journal_ids': [(6, 0, self.env['account.journal'].search(
+                [('company_id', '=', self.env.company.id)]).ids)],
+        }, **(vals or {})))
+        output, filename, mimetype = self.env['account.report.tabular.export']._export(
+            wizard._get_export_action(), 'csv')
+        with output:
+            rows = list(csv.reader(io.TextIOWrapper(output, encoding='utf-8', newline='')))
+        self.assertEqual(mimetype, 'text/csv')
+        self.assertTrue(filename.endswith('.csv'))
+        return rows
+
+    def test_export_general_ledger(self):
+        rows = self._export('account.report.general.ledger')
+        self.assertGreater(len(rows), 1)
+        self.assertIn(self.invoice.name, [row[6] for row in rows[1:]])
+
+    def test_export_partner_ledger(self):
+        rows = self._export('account.report.partner.ledger', {'result_selection': 'customer'})
+        self.assertIn(self.partner_a.name, [row[1] for row in rows[1:]])
+
+    def test_export_trial_balance(self):
+        rows = self._export('account.balance.report')
+        receivable = self.company_data['default_account_receivable']
+        self.assertIn(receivable.code, [row[0] for row in rows[1:]])
+
+    def test_export_aged_balance(self):
+        rows = self._export('account.aged.trial.balance', {'result_selection': 'customer'})
+        self.assertIn(self.partner_a.name, [value for row in rows[1:] for value in row])
@@ -37,12 +37,17 @@ class AccountingReport(models.TransientModel):
             result['date_from'] = data['form']['date_from_cmp']
             result['date_to'] = data['form']['date_to_cmp']
             result['strict_range'] = True
+        if data['form'].get('consolidation'):
+            # journals belong to a single company, the filter would drop the others
+            result['journal_ids'] = False
+            result['allowed_company_ids'] = self.env.companies.ids
+            result['consolidation'] = True
         return result
 
     def check_report(self):
         res = super(AccountingReport, self).check_report()
         data = {}
-        data['form'] = self.read(['account_report_id', 'date_from_cmp', 'date_to_cmp', 'journal_ids', 'filter_cmp', 'target_move'])[0]
+        data['form'] = self.read(['account_report_id', 'date_from_cmp', 'date_to_cmp', 'journal_ids', 'filter_cmp', 'target_move', 'consolidation'])[0]
         for field in ['account_report_id']:
             if isinstance(data['form'][field], tuple):
                 data['form'][field] = data['form'][field][0]
@@ -19,6 +19,11 @@ class AccountCommonReport(models.TransientModel):
     target_move = fields.Selection([('posted', 'All Posted Entries'),
                                     ('all', 'All Entries'),
                                     ], string='Target Moves', required=True, default='posted')
+    consolidation = fields.Boolean(
+        string='Consolidate Companies',
+        help="Compute the report over all the selected companies. Each company is "
+             "aggregated separately and its amounts are converted in the currency of "
+             "the current company. The journal filter is not applied.")
 
     @api.onchange('company_id')
     def _onchange_company_id(self):
@@ -36,6 +41,12 @@ class AccountCommonReport(models.TransientModel):
         result['date_to'] = data['form']['date_to'] or False
         result['strict_range'] = True if result['date_from'] else False
         result['company_id'] = data['form']['company_id'][0] or False
+        if data['form'].get('consolidation'):
+            result['company_id'] = False
+            # journals belong to a single company, the filter would drop the others
+            result['journal_ids'] = False
+            result['allowed_company_ids'] = self.env.companies.ids
+            result['consolidation'] = True
         return result
 
     def _print_report(self, data):
@@ -46,7 +57,49 @@ class AccountCommonReport(models.TransientModel):
         data = {}
         data['ids'] = self.env.context.get('active_ids', [])
         data['model'] = self.env.context.get('active_model', 'ir.ui.menu')
-        data['form'] = self.read(['date_from', 'date_to', 'journal_ids', 'target_move', 'company_id'])[0]
+        data['form'] = self.read(['date_from', 'date_to', 'journal_ids', 'target_move', 'company_id', 'consolidation'])[0]
         used_context = self._build_contexts(data)
         data['form']['used_context'] = dict(used_context, lang=get_lang(self.env).code)
         return self.with_context(discard_logo_check=True)._print_report(data)
+
+    def _get_export_action(self):
+        """ Returns the report action exported by the controller, with the active
+            wizard in its context as the web client adds it after a button call.
+        """
+        self.ensure_one()
+        action = self.check_report()
+        if action.get('type') == 'ir.actions.report':
+            action['context'] = dict(action.get('context') or {}, active_model=self._name,
+                                     active_id=self.id, active_ids=self.ids)
+        return action
+
+    def _action_export(self, file_format):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/accounting_pdf_reports/export/%s/%s/%s' % (self._name, self.id, file_format),
+            'target': 'self',
+        }
+
+    def action_export_xlsx(self):
+        return self._action_export('xlsx')
+
+    def action_export_csv(self):
+        return self._action_export('csv')
+
+    def action_open_ledger_browser(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'accounting_pdf_reports.ledger_browser',
+            'name': self._description,
+            'params': {'model': self._name, 'wizard_id': self.id},
+        }
+
+    def action_print_background(self):
+        action = self.check_report()
+        if action.get('type') != 'ir.actions.report':
+            return action
+        # added by the web client to the action of a button, not on the server
+        action['context'] = dict(action.get('context') or {}, active_model=self._name, active_id=self.id)
+        return self.env['account.report.job']._enqueue(action)
@@ -1,4 +1,6 @@
-from odoo import models, api, fields
+from odoo import models, api, fields, _
+from odoo.exceptions import UserError
+from dateutil.relativedelta import relativedelta
 from datetime import date
 
 
@@ -15,6 +17,40 @@ class AccountTaxReport(models.TransientModel):
         string='Date To', required=True,
         default=lambda self: fields.Date.to_string(date.today())
     )
+    period_count = fields.Integer(
+        string='Number of Periods', required=True, default=1,
+        help="Compare the selected period with the previous periods of the same length, "
+             "e.g. select a quarter and 4 periods to compare the last four quarters."
+    )
+
+    def _get_report_data(self, data):
+        self.ensure_one()
+        if self.period_count < 1:
+            raise UserError(_('You must set a number of periods greater than 0.'))
+        if self.date_from > self.date_to:
+            raise UserError(_('The start date must be before the end date.'))
+        # whole months are shifted by months so that quarters stay aligned
+        months = None
+        if self.date_from.day == 1 and (self.date_to + relativedelta(days=1)).day == 1:
+            months = relativedelta(self.date_to + relativedelta(days=1), self.date_from)
+            months = months.years * 12 + months.months
+        periods = []
+        for index in range(self.period_count):
+            if months:
+                date_from = self.date_from - relativedelta(months=months * index)
+                date_to = self.date_from - relativedelta(months=months * (index - 1), days=1)
+            else:
+                length = (self.date_to - self.date_from).days + 1
+                date_from = self.date_from - relativedelta(days=length * index)
+                date_to = self.date_to - relativedelta(days=length * index)
+            periods.append({
+                'name': '%s - %s' % (date_from.strftime('%Y-%m-%d'), date_to.strftime('%Y-%m-%d')),
+                'date_from': date_from.strftime('%Y-%m-%d'),
+                'date_to': date_to.strftime('%Y-%m-%d'),
+            })
+        data['form']['periods'] = periods
+        return data
 
     def _print_report(self, data):
+        data = self._get_report_data(data)
         return self.env.ref('accounting_pdf_reports.action_report_account_tax').report_action(self, data=data)
@@ -1,4 +1,5 @@
-from odoo import fields, models, api
+from odoo import fields, models, api, _
+from odoo.exceptions import UserError
 
 
 class AccountBalanceReport(models.TransientModel):
@@ -16,8 +17,20 @@ class AccountBalanceReport(models.TransientModel):
         'account_trial_balance_analytic_rel', string='Analytic Accounts'
     )
 
+    hierarchy = fields.Boolean(
+        string='Account Groups Hierarchy',
+        help="Display the accounts under their account groups, with the totals of each group."
+    )
+    opening_closing = fields.Boolean(
+        string='Opening and Closing Balances',
+        help="Add the balance before the start date and the balance at the end date."
+    )
+
     def _get_report_data(self, data):
         data = self.pre_print_report(data)
+        data['form'].update(self.read(['hierarchy', 'opening_closing'])[0])
+        if data['form'].get('opening_closing') and data['form'].get('consolidation'):
+            raise UserError(_("The opening and closing balances cannot be computed for a consolidation."))
         records = self.env[data['model']].browse(data.get('ids', []))
         return records, data
 
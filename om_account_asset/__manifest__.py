@@ -17,11 +17,13 @@
         'security/ir.model.access.csv',
         'wizard/asset_depreciation_confirmation_wizard_views.xml',
         'wizard/asset_modify_views.xml',
+        'wizard/asset_depreciation_forecast_views.xml',
         'views/account_asset_views.xml',
         'views/account_move_views.xml',
         'views/account_asset_templates.xml',
         'views/asset_category_views.xml',
         'views/product_views.xml',
+        'views/account_asset_depreciation_run_views.xml',
         'report/account_asset_report_views.xml',
     ],
     'assets': {
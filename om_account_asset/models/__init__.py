@@ -2,5 +2,7 @@
 
 from . import account
 from . import account_asset
+from . import account_asset_benchmark
+from . import account_asset_depreciation_run
 from . import account_move
 from . import product
@@ -16,6 +16,10 @@ class AccountMove(models.Model):
                 line.move_posted_check = False
         return super(AccountMove, self).button_cancel()
 
+    def unlink(self):
+        self.env['asset.asset.report']._mark_assets(self.asset_depreciation_ids.asset_id.ids)
+        return super(AccountMove, self).unlink()
+
     def action_post(self):
         for move in self:
             for depreciation_line in move.asset_depreciation_ids:
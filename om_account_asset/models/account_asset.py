@@ -1,12 +1,21 @@
-import calendar
-from datetime import date, datetime
-from dateutil.relativedelta import relativedelta
-
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
-from odoo.tools import float_compare, float_is_zero
+from odoo.tools import float_compare, split_every
 from markupsafe import Markup
 
+from .depreciation_board import AssetParams, board_amount, compute_boards, forecast_boards, undone_dotation_number
+from ..report.account_asset_report import ASSET_REPORT_ASSET_FIELDS, ASSET_REPORT_LINE_FIELDS
+
+# fields of the assets the depreciation board depends on
+DEPRECIATION_BOARD_FIELDS = {
+    'code', 'value', 'salvage_value', 'date', 'method', 'method_number', 'method_period',
+    'method_end', 'method_progress_factor', 'method_time', 'prorata', 'date_first_depreciation',
+    'first_depreciation_manual_date', 'currency_id', 'company_id',
+}
+
+# number of depreciation entries created and posted together
+DEPRECIATION_MOVE_BATCH_SIZE = 500
+
 
 class AccountAssetCategory(models.Model):
     _name = 'account.asset.category'
@@ -125,7 +134,7 @@ class AccountAssetAsset(models.Model):
     _description = 'Asset/Revenue Recognition'
     _inherit = ['mail.thread', 'mail.activity.mixin', 'analytic.mixin']
 
-    entry_count = fields.Integer(compute='_entry_count', string='# Asset Entries')
+    entry_count = fields.Integer(compute='_entry_count', string='# Asset Entries', store=True, index=True)
     name = fields.Char(string='Asset Name', required=True)
     code = fields.Char(string='Reference', size=32)
     value = fields.Monetary(string='Gross Value', required=True)
@@ -168,7 +177,7 @@ class AccountAssetAsset(models.Model):
     method_progress_factor = fields.Float(
         string='Degressive Factor', default=0.3
     )
-    value_residual = fields.Monetary(compute='_amount_residual', string='Residual Value')
+    value_residual = fields.Monetary(compute='_amount_residual', string='Residual Value', store=True, index=True)
     method_time = fields.Selection(
         [('number', 'Number of Entries'), ('end', 'Ending Date')],
         string='Time Method', required=True, default='number',
@@ -215,14 +224,19 @@ class AccountAssetAsset(models.Model):
             for depreciation_line in asset.depreciation_line_ids:
                 if depreciation_line.move_id:
                     raise UserError(_('You cannot delete a document that contains posted entries.'))
+        self.env['asset.asset.report']._mark_assets(self.ids)
         return super(AccountAssetAsset, self).unlink()
 
     @api.model
     def _cron_generate_entries(self):
-        self.compute_generated_entries(datetime.today())
+        self.env['account.asset.depreciation.run']._cron_generate_entries()
 
     @api.model
-    def compute_generated_entries(self, date, asset_type=None):
+    def compute_generated_entries(self, date, asset_type=None, commit=False):
+        """ Generate the depreciation entries of the running assets up to `date`.
+            With `commit`, the entries are committed by batches: when the run is
+            interrupted, running it again only processes the lines left without entry.
+        """
         # Entries generated : one by grouped category and one by asset from ungrouped category
         created_move_ids = []
         type_domain = []
@@ -230,130 +244,131 @@ class AccountAssetAsset(models.Model):
             type_domain = [('type', '=', asset_type)]
 
         ungrouped_assets = self.env['account.asset.asset'].search(type_domain + [('state', '=', 'open'), ('category_id.group_entries', '=', False)])
-        created_move_ids += ungrouped_assets._compute_entries(date, group_entries=False)
-
-        for grouped_category in self.env['account.asset.category'].search(type_domain + [('group_entries', '=', True)]):
-            assets = self.env['account.asset.asset'].search([('state', '=', 'open'), ('category_id', '=', grouped_category.id)])
-            created_move_ids += assets._compute_entries(date, group_entries=True)
+        created_move_ids += ungrouped_assets._compute_entries(date, group_entries=False, commit=commit)
+
+        # the due lines of all the grouped categories are fetched at once
+        grouped_domain = [('asset_id.category_id.type', '=', asset_type)] if asset_type else []
+        grouped_lines = self.env['account.asset.depreciation.line'].search(grouped_domain + [
+            ('asset_id.state', '=', 'open'), ('asset_id.category_id.group_entries', '=', True),
+            ('depreciation_date', '<=', date), ('move_check', '=', False)])
+        created_move_ids += grouped_lines.create_grouped_move()
         return created_move_ids
 
     def _compute_board_amount(self, sequence, residual_amount, amount_to_depr,
                               undone_dotation_number, posted_depreciation_line_ids,
                               total_days, depreciation_date):
-        amount = 0
-        if sequence == undone_dotation_number:
-            amount = residual_amount
-        else:
-            if self.method == 'linear':
-                amount = amount_to_depr / (undone_dotation_number - len(posted_depreciation_line_ids))
-                if self.prorata:
-                    amount = amount_to_depr / self.method_number
-                    if sequence == 1:
-                        date = self.date
-                        if self.method_period % 12 != 0:
-                            month_days = calendar.monthrange(date.year, date.month)[1]
-                            days = month_days - date.day + 1
-                            amount = (amount_to_depr / self.method_number) / month_days * days
-                        else:
-                            days = (self.company_id.compute_fiscalyear_dates(date)['date_to'] - date).days + 1
-                            amount = (amount_to_depr / self.method_number) / total_days * days
-            elif self.method == 'degressive':
-                amount = residual_amount * self.method_progress_factor
-                if self.prorata:
-                    if sequence == 1:
-                        date = self.date
-                        if self.method_period % 12 != 0:
-                            month_days = calendar.monthrange(date.year, date.month)[1]
-                            days = month_days - date.day + 1
-                            amount = (residual_amount * self.method_progress_factor) / month_days * days
-                        else:
-                            days = (self.company_id.compute_fiscalyear_dates(date)['date_to'] - date).days + 1
-                            amount = (residual_amount * self.method_progress_factor) / total_days * days
-        return amount
+        params = self._get_depreciation_board_params()[self.id]._replace(
+            posted_count=len(posted_depreciation_line_ids))
+        return board_amount(params, sequence, residual_amount, amount_to_depr, undone_dotation_number, total_days)
 
     def _compute_board_undone_dotation_nb(self, depreciation_date, total_days):
-        undone_dotation_number = self.method_number
-        if self.method_time == 'end':
-            end_date = self.method_end
-            undone_dotation_number = 0
-            while depreciation_date <= end_date:
-                depreciation_date = date(depreciation_date.year, depreciation_date.month,
-                                         depreciation_date.day) + relativedelta(months=+self.method_period)
-                undone_dotation_number += 1
-        if self.prorata:
-            undone_dotation_number += 1
-        return undone_dotation_number
+        return undone_dotation_number(self._get_depreciation_board_params()[self.id], depreciation_date)
+
+    def _get_depreciation_board_params(self):
+        """ Returns a dictionary {asset ID: AssetParams} with the parameters of the
+            depreciation boards of the assets, read in batch.
+        """
+        if not self:
+            return {}
+        self.env['account.asset.depreciation.line'].flush_model(['asset_id', 'move_check', 'depreciation_date'])
+        self.env.cr.execute("""
+            SELECT asset_id, COUNT(*), MAX(depreciation_date)
+            FROM account_asset_depreciation_line
+            WHERE asset_id IN %s AND move_check
+            GROUP BY asset_id""", [tuple(self.ids)])
+        posted = {asset_id: (count, last_date) for asset_id, count, last_date in self.env.cr.fetchall()}
+        fiscalyear_ends = {}
+        res = {}
+        for asset in self:
+            posted_count, last_posted_date = posted.get(asset.id, (0, None))
+            company = asset.company_id
+            fiscalyear_end = None
+            # also when the period is not yearly, as the forecast may override it
+            if asset.prorata:
+                key = (company.id, asset.date)
+                if key not in fiscalyear_ends:
+                    fiscalyear_ends[key] = company.compute_fiscalyear_dates(asset.date)['date_to']
+                fiscalyear_end = fiscalyear_ends[key]
+            res[asset.id] = AssetParams(
+                code=asset.code,
+                value=asset.value,
+                salvage_value=asset.salvage_value,
+                value_residual=asset.value_residual,
+                date=asset.date,
+                method=asset.method,
+                method_number=asset.method_number,
+                method_period=asset.method_period,
+                method_end=asset.method_end,
+                method_progress_factor=asset.method_progress_factor,
+                method_time=asset.method_time,
+                prorata=asset.prorata,
+                date_first_depreciation=asset.date_first_depreciation,
+                first_depreciation_manual_date=asset.first_depreciation_manual_date,
+                posted_count=posted_count,
+                last_posted_date=last_posted_date,
+                fiscalyear_last_month=company.fiscalyear_last_month,
+                fiscalyear_last_day=company.fiscalyear_last_day,
+                fiscalyear_end=fiscalyear_end,
+                rounding=asset.currency_id.rounding,
+            )
+        return res
 
     def compute_depreciation_board(self):
-        self.ensure_one()
-
-        posted_depreciation_line_ids = self.depreciation_line_ids.filtered(lambda x: x.move_check).sorted(key=lambda l: l.depreciation_date)
-        unposted_depreciation_line_ids = self.depreciation_line_ids.filtered(lambda x: not x.move_check)
-
-        # Remove old unposted depreciation lines. We cannot use unlink() with One2many field
-        commands = [(2, line_id.id, False) for line_id in unposted_depreciation_line_ids]
-
-        if self.value_residual != 0.0:
-            amount_to_depr = residual_amount = self.value_residual
-
-            # if we already have some previous validated entries, starting date is last entry + method period
-            if posted_depreciation_line_ids and posted_depreciation_line_ids[-1].depreciation_date:
-                last_depreciation_date = fields.Date.from_string(posted_depreciation_line_ids[-1].depreciation_date)
-                depreciation_date = last_depreciation_date + relativedelta(months=+self.method_period)
-            else:
-                # depreciation_date computed from the purchase date
-                depreciation_date = self.date
-                if self.date_first_depreciation == 'last_day_period':
-                    # depreciation_date = the last day of the month
-                    depreciation_date = depreciation_date + relativedelta(day=31)
-                    # ... or fiscalyear depending the number of period
-                    if self.method_period == 12:
-                        depreciation_date = depreciation_date + relativedelta(month=int(self.company_id.fiscalyear_last_month))
-                        depreciation_date = depreciation_date + relativedelta(day=int(self.company_id.fiscalyear_last_day))
-                        if depreciation_date < self.date:
-                            depreciation_date = depreciation_date + relativedelta(years=1)
-                elif self.first_depreciation_manual_date and self.first_depreciation_manual_date != self.date:
-                    # depreciation_date set manually from the 'first_depreciation_manual_date' field
-                    depreciation_date = self.first_depreciation_manual_date
-            total_days = (depreciation_date.year % 4) and 365 or 366
-            month_day = depreciation_date.day
-            undone_dotation_number = self._compute_board_undone_dotation_nb(depreciation_date, total_days)
-
-            for x in range(len(posted_depreciation_line_ids), undone_dotation_number):
-                sequence = x + 1
-                amount = self._compute_board_amount(sequence, residual_amount, amount_to_depr,
-                                                    undone_dotation_number, posted_depreciation_line_ids,
-                                                    total_days, depreciation_date)
-                amount = self.currency_id.round(amount)
-                if float_is_zero(amount, precision_rounding=self.currency_id.rounding):
-                    continue
-                residual_amount -= amount
-                vals = {
+        """ Replace the unposted depreciation lines of the assets by their schedule,
+            computed for all the assets at once by the depreciation board engine, with
+            one unlink of the old lines and one create of the new ones.
+        """
+        boards = compute_boards(self._get_depreciation_board_params())
+        DepreciationLine = self.env['account.asset.depreciation.line']
+        DepreciationLine.search([('asset_id', 'in', self.ids), ('move_check', '=', False)]).unlink()
+        vals_list = []
+        for asset in self:
+            board = boards[asset.id]
+            for sequence, depreciation_date, amount, remaining_value, depreciated_value in zip(*board):
+                vals_list.append({
                     'amount': amount,
-                    'asset_id': self.id,
+                    'asset_id': asset.id,
                     'sequence': sequence,
-                    'name': (self.code or '') + '/' + str(sequence),
-                    'remaining_value': residual_amount,
-                    'depreciated_value': self.value - (self.salvage_value + residual_amount),
+                    'name': (asset.code or '') + '/' + str(sequence),
+                    'remaining_value': remaining_value,
+                    'depreciated_value': depreciated_value,
                     'depreciation_date': depreciation_date,
-                }
-                commands.append((0, False, vals))
-
-                depreciation_date = depreciation_date + relativedelta(months=+self.method_period)
-
-                if month_day > 28 and self.date_first_depreciation == 'manual':
-                    max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
-                    depreciation_date = depreciation_date.replace(day=min(max_day_in_month, month_day))
-
-                # datetime doesn't take into account that the number of days is not the same for each month
-                if not self.prorata and self.method_period % 12 != 0 and self.date_first_depreciation == 'last_day_period':
-                    max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
-                    depreciation_date = depreciation_date.replace(day=max_day_in_month)
-
-        self.write({'depreciation_line_ids': commands})
-
+                })
+        DepreciationLine.create(vals_list)
         return True
 
+    def _get_depreciation_forecast(self, date_from=None, date_to=None, period='month', overrides=None):
+        """ Project the depreciation of the assets by period, category and company.
+            The schedules are computed in memory, no line is written, and
+            `overrides` is a dictionary of AssetParams values (e.g. method_number or
+            method_progress_factor) replacing those of every asset to simulate other
+            parameters. Returns a list of dictionaries {'date', 'category_id',
+            'company_id', 'amount'} sorted by date, the amounts being in the currency
+            of the company.
+        """
+        overrides = dict(overrides or {})
+        if overrides.get('method_number'):
+            overrides.setdefault('method_time', 'number')
+        params_by_asset = self._get_depreciation_board_params()
+        if overrides:
+            params_by_asset = {asset_id: params._replace(**overrides) for asset_id, params in params_by_asset.items()}
+        groups = {asset.id: (asset.category_id.id, asset.company_id.id, asset.currency_id.id) for asset in self}
+        amounts = forecast_boards(params_by_asset, groups, date_from, date_to, period)
+
+        today = fields.Date.context_today(self)
+        res = {}
+        for (depreciation_date, (category_id, company_id, currency_id)), amount in amounts.items():
+            company = self.env['res.company'].browse(company_id)
+            currency = self.env['res.currency'].browse(currency_id)
+            if currency != company.currency_id:
+                amount = currency._convert(amount, company.currency_id, company, today)
+            key = (depreciation_date, category_id, company_id)
+            res[key] = res.get(key, 0.0) + amount
+        return [
+            {'date': depreciation_date, 'category_id': category_id, 'company_id': company_id, 'amount': amount}
+            for (depreciation_date, category_id, company_id), amount in sorted(res.items())
+        ]
+
     def validate(self):
         self.write({'state': 'open'})
         fields = [
@@ -441,11 +456,16 @@ class AccountAssetAsset(models.Model):
 
     @api.depends('value', 'salvage_value', 'depreciation_line_ids.move_check', 'depreciation_line_ids.amount')
     def _amount_residual(self):
+        # only the assets whose lines changed are recomputed, with a single query
+        assets = self.filtered('id')
+        posted_amounts = dict(self.env['account.asset.depreciation.line']._read_group(
+            [('asset_id', 'in', assets.ids), ('move_check', '=', True)], ['asset_id'], ['amount:sum'],
+        )) if assets else {}
         for rec in self:
-            total_amount = 0.0
-            for line in rec.depreciation_line_ids:
-                if line.move_check:
-                    total_amount += line.amount
+            if rec.id:
+                total_amount = posted_amounts.get(rec, 0.0)
+            else:
+                total_amount = sum(line.amount for line in rec.depreciation_line_ids if line.move_check)
             rec.value_residual = rec.value - total_amount - rec.salvage_value
 
     @api.onchange('company_id')
@@ -460,9 +480,15 @@ class AccountAssetAsset(models.Model):
 
     @api.depends('depreciation_line_ids.move_id')
     def _entry_count(self):
+        assets = self.filtered('id')
+        counts = dict(self.env['account.asset.depreciation.line']._read_group(
+            [('asset_id', 'in', assets.ids), ('move_id', '!=', False)], ['asset_id'], ['__count'],
+        )) if assets else {}
         for asset in self:
-            res = self.env['account.asset.depreciation.line'].search_count([('asset_id', '=', asset.id), ('move_id', '!=', False)])
-            asset.entry_count = res or 0
+            if asset.id:
+                asset.entry_count = counts.get(asset, 0)
+            else:
+                asset.entry_count = len(asset.depreciation_line_ids.filtered('move_id'))
 
     @api.constrains('prorata', 'method_time')
     def _check_prorata(self):
@@ -506,26 +532,33 @@ class AccountAssetAsset(models.Model):
         default['name'] = self.name + _(' (copy)')
         return super(AccountAssetAsset, self).copy_data(default)
 
-    def _compute_entries(self, date, group_entries=False):
+    def _compute_entries(self, date, group_entries=False, commit=False):
         depreciation_ids = self.env['account.asset.depreciation.line'].search([
             ('asset_id', 'in', self.ids), ('depreciation_date', '<=', date),
             ('move_check', '=', False)])
         if group_entries:
             return depreciation_ids.create_grouped_move()
-        return depreciation_ids.create_move()
+        return depreciation_ids.create_move(commit=commit)
 
     @api.model_create_multi
     def create(self, vals_list):
         assets = super(AccountAssetAsset, self.with_context(mail_create_nolog=True)).create(vals_list)
-        for asset in assets:
-            asset.sudo().compute_depreciation_board()
+        assets.sudo().compute_depreciation_board()
         return assets
 
     def write(self, vals):
+        # the boards of all the written assets are recomputed together, and only
+        # when a parameter they depend on actually changed
+        recompute = 'depreciation_line_ids' not in vals and 'state' not in vals and \
+            not DEPRECIATION_BOARD_FIELDS.isdisjoint(vals)
+        if recompute:
+            old_params = self._get_depreciation_board_params()
         res = super(AccountAssetAsset, self).write(vals)
-        if 'depreciation_line_ids' not in vals and 'state' not in vals:
-            for rec in self:
-                rec.compute_depreciation_board()
+        if recompute:
+            new_params = self._get_depreciation_board_params()
+            self.filtered(lambda asset: old_params[asset.id] != new_params[asset.id]).compute_depreciation_board()
+        if not ASSET_REPORT_ASSET_FIELDS.isdisjoint(vals):
+            self.env['asset.asset.report']._mark_assets(self.ids)
         return res
 
     def open_entries(self):
@@ -552,7 +585,7 @@ class AccountAssetDepreciationLine(models.Model):
     name = fields.Char(string='Depreciation Name', required=True, index=True)
     sequence = fields.Integer(required=True)
     asset_id = fields.Many2one('account.asset.asset', string='Asset',
-                               required=True, ondelete='cascade')
+                               required=True, index=True, ondelete='cascade')
     parent_state = fields.Selection(related='asset_id.state',
                                     string='State of Asset')
     amount = fields.Monetary(string='Current Depreciation',
@@ -581,18 +614,41 @@ class AccountAssetDepreciationLine(models.Model):
         for line in self:
             line.move_posted_check = True if line.move_id and line.move_id.state == 'posted' else False
 
-    def create_move(self, post_move=True):
+    def _link_moves(self, moves):
+        """ Set the move of every line, `moves` being ordered as the lines, with a
+            single query.
+        """
+        self.flush_model(['move_id'])
+        self.env.cr.execute("""
+            UPDATE account_asset_depreciation_line AS line
+            SET move_id = link.move_id
+            FROM (VALUES %s) AS link(line_id, move_id)
+            WHERE line.id = link.line_id""" % ', '.join(['(%s, %s)'] * len(self)),
+            [value for line, move in zip(self, moves) for value in (line.id, move.id)])
+        self.invalidate_recordset(['move_id'])
+        moves.invalidate_recordset(['asset_depreciation_ids'])
+        self.modified(['move_id'])
+        self.env['asset.asset.report']._mark_assets(self.asset_id.ids)
+
+    def create_move(self, post_move=True, commit=False):
+        """ Create the depreciation entries of the lines by batches: the entries of a
+            batch are created with a single create, linked to their lines with a
+            single query and posted together. With `commit`, each batch is committed
+            so that a failure only rolls back the current batch.
+        """
+        if any(line.move_id for line in self):
+            raise UserError(_('This depreciation is already linked to a journal entry. Please post or delete it.'))
         created_moves = self.env['account.move']
-        for line in self:
-            if line.move_id:
-                raise UserError(_('This depreciation is already linked to a journal entry. Please post or delete it.'))
-            move_vals = self._prepare_move(line)
-            move = self.env['account.move'].create(move_vals)
-            line.write({'move_id': move.id, 'move_check': True})
-            created_moves |= move
-
-        if post_move and created_moves:
-            created_moves.filtered(lambda m: any(m.asset_depreciation_ids.mapped('asset_id.category_id.open_asset'))).action_post()
+        for lines in split_every(DEPRECIATION_MOVE_BATCH_SIZE, self.ids, self.browse):
+            moves = self.env['account.move'].create([self._prepare_move(line) for line in lines])
+            lines._link_moves(moves)
+            created_moves |= moves
+            if post_move:
+                moves.browse([
+                    move.id for line, move in zip(lines, moves) if line.asset_id.category_id.open_asset
+                ]).action_post()
+            if commit and not self.env.registry.in_test_mode():
+                self.env.cr.commit()
         return [x.id for x in created_moves]
 
     def _prepare_move(self, line):
@@ -634,20 +690,22 @@ class AccountAssetDepreciationLine(models.Model):
         return move_vals
 
     def _prepare_move_grouped(self):
+        """ Values of the entry of lines sharing their category, company, analytic
+            distribution and depreciation date, each amount being converted at
+            this date.
+        """
         asset_id = self[0].asset_id
-        category_id = asset_id.category_id  # we can suppose that all lines have the same category
-        account_analytic_id = asset_id.account_analytic_id
-        # analytic_tag_ids = asset_id.analytic_tag_ids
+        category_id = asset_id.category_id
         analytic_distribution = asset_id.analytic_distribution
 
-        depreciation_date = self.env.context.get('depreciation_date') or fields.Date.context_today(self)
+        depreciation_date = self.env.context.get('depreciation_date') or self[0].depreciation_date or fields.Date.context_today(self)
         amount = 0.0
         for line in self:
             # Sum amount of all depreciation lines
             company_currency = line.asset_id.company_id.currency_id
             current_currency = line.asset_id.currency_id
             company = line.asset_id.company_id
-            amount += current_currency._convert(line.amount, company_currency, company, fields.Date.today())
+            amount += current_currency._convert(line.amount, company_currency, company, depreciation_date)
 
         name = category_id.name + _(' (grouped)')
         move_line_1 = {
@@ -675,18 +733,39 @@ class AccountAssetDepreciationLine(models.Model):
 
         return move_vals
 
+    def _get_grouped_move_lines(self):
+        """ Split the lines in the groups sharing a grouped entry: a list of
+            recordsets of lines having the same category, company, analytic
+            distribution and depreciation date.
+        """
+        forced_date = self.env.context.get('depreciation_date')
+        groups = {}
+        for line in self:
+            asset = line.asset_id
+            key = (
+                asset.category_id.id,
+                asset.company_id.id,
+                tuple(sorted((asset.analytic_distribution or {}).items())),
+                forced_date or line.depreciation_date,
+            )
+            groups.setdefault(key, []).append(line.id)
+        return [self.browse(line_ids) for line_ids in groups.values()]
+
     def create_grouped_move(self, post_move=True):
+        """ Create the grouped entries of the lines, one per group of
+            _get_grouped_move_lines, with a single create.
+        """
         if not self.exists():
             return []
 
-        created_moves = self.env['account.move']
-        move = self.env['account.move'].create(self._prepare_move_grouped())
-        self.write({'move_id': move.id, 'move_check': True})
-        created_moves |= move
+        groups = self.exists()._get_grouped_move_lines()
+        moves = self.env['account.move'].create([lines._prepare_move_grouped() for lines in groups])
+        lines = self.browse([line_id for group in groups for line_id in group.ids])
+        lines._link_moves(moves.browse([move.id for group, move in zip(groups, moves) for dummy in group]))
 
-        if post_move and created_moves:
-            created_moves.action_post()
-        return [x.id for x in created_moves]
+        if post_move and moves:
+            moves.action_post()
+        return moves.ids
 
     def post_lines_and_close_asset(self):
         # we re-evaluate the assets to determine whether we can close them
@@ -725,4 +804,16 @@ class AccountAssetDepreciationLine(models.Model):
                 else:
                     msg = _("You cannot delete posted installment lines.")
                 raise UserError(msg)
-        return super(AccountAssetDepreciationLine, self).unlink()
\ No newline at end of file
+        self.env['asset.asset.report']._mark_assets(self.asset_id.ids)
+        return super(AccountAssetDepreciationLine, self).unlink()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(AccountAssetDepreciationLine, self).create(vals_list)
+        self.env['asset.asset.report']._mark_assets(lines.asset_id.ids)
+        return lines
+
+    def write(self, vals):
+        if not ASSET_REPORT_LINE_FIELDS.isdisjoint(vals):
+            self.env['asset.asset.report']._mark_assets(self.asset_id.ids + [vals.get('asset_id')])
+        return super(AccountAssetDepreciationLine, self).write(vals)
\ No newline at end of file
@@ -0,0 +1,392 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import calendar
+import itertools
+import json
+import logging
+import random
+import time
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models, Command, release, _
+from odoo.exceptions import UserError
+from odoo.tools import float_is_zero
+
+from .depreciation_board import compute_boards
+
+_logger = logging.getLogger(__name__)
+
+BENCHMARK_COMPANY_NAME = 'Depreciation Benchmark'
+
+# parameters combined by the generated assets, every combination being covered
+BENCHMARK_METHODS = ('linear', 'degressive')
+BENCHMARK_METHOD_TIMES = ('number', 'end')
+BENCHMARK_PRORATA = (False, True)
+BENCHMARK_FIRST_DEPRECIATIONS = ('last_day_period', 'manual')
+BENCHMARK_PERIODS = (1, 3, 6, 12)
+# ends of months, leap days and mid-month purchase dates
+BENCHMARK_DATES = (
+    '2023-01-01', '2023-01-31', '2023-02-28', '2023-06-15',
+    '2023-12-31', '2024-02-29', '2024-03-31', '2024-08-30',
+)
+
+# columns of the depreciation lines compared with the golden output
+BENCHMARK_LINE_FIELDS = ('sequence', 'depreciation_date', 'amount', 'remaining_value', 'depreciated_value')
+
+
+class AccountAssetBenchmark(models.AbstractModel):
+    _name = 'account.asset.benchmark'
+    _description = 'Depreciation Board Benchmark'
+
+    # Usage, from `odoo-bin shell -d <database>` on a database dedicated to it:
+    #   company = env['account.asset.benchmark']._generate_assets()
+    #   env['account.asset.benchmark']._save_golden(company, '/tmp/golden.json')
+    #   ... change the depreciation engine ...
+    # The golden output comes from the line by line computation of the boards
+    # (_run_legacy), kept here as the reference the engines must reproduce.
+    #   env['account.asset.benchmark']._run_benchmark(company, '/tmp/golden.json', output='/tmp/bench.json')
+
+    @api.model
+    def _commit(self):
+        if not self.env.registry.in_test_mode():
+            self.env.cr.commit()
+
+    @api.model
+    def _generate_assets(self, name=BENCHMARK_COMPANY_NAME, assets_per_combination=10, batch_size=500, seed=42):
+        """ Create a company with draft assets covering every combination of
+            computation method, time method, prorata, first depreciation date, period
+            length and purchase date (leap days and ends of months included), with
+            random values, numbers of depreciations, ending dates and degressive
+            factors. The assets are identified by their code and the generation is
+            deterministic for a given `seed`.
+
+            Returns the company.
+        """
+        rng = random.Random(seed)
+        company = self.env['res.company'].create({
+            'name': name,
+            'country_id': self.env.company.country_id.id or self.env.ref('base.us').id,
+        })
+        self.env.user.company_ids |= company
+        Benchmark = self.with_company(company)
+
+        def create_account(code, account_type, name):
+            return Benchmark.env['account.account'].create({
+                'code': code, 'name': name, 'account_type': account_type,
+                'company_ids': [Command.set(company.ids)],
+            })
+        category = Benchmark.env['account.asset.category'].create({
+            'name': 'Benchmark Assets',
+            'company_id': company.id,
+            'account_asset_id': create_account('DB2100', 'asset_fixed', 'Benchmark Assets').id,
+            'account_depreciation_id': create_account('DB2800', 'asset_fixed', 'Benchmark Depreciation').id,
+            'account_depreciation_expense_id': create_account(
+                'DB6800', 'expense_depreciation', 'Benchmark Depreciation Expense').id,
+            'journal_id': Benchmark.env['account.journal'].create({
+                'name': 'Benchmark Depreciation', 'code': 'BDEP', 'type': 'general',
+            }).id,
+            'method_number': 5,
+            'method_period': 12,
+        })
+
+        vals_list = []
+        combinations = itertools.product(BENCHMARK_METHODS, BENCHMARK_METHOD_TIMES, BENCHMARK_PRORATA,
+                                         BENCHMARK_FIRST_DEPRECIATIONS, BENCHMARK_PERIODS, BENCHMARK_DATES)
+        for method, method_time, prorata, first_depreciation, period, date in combinations:
+            if prorata and method_time != 'number':
+                # prorata temporis is only allowed with a number of depreciations
+                continue
+            date = fields.Date.to_date(date)
+            for dummy in range(assets_per_combination):
+                value = round(rng.uniform(100, 100000), 2)
+                vals_list.append({
+                    'name': 'Benchmark Asset %s' % (len(vals_list) + 1),
+                    'code': 'DB%06d' % (len(vals_list) + 1),
+                    'category_id': category.id,
+                    'company_id': company.id,
+                    'currency_id': company.currency_id.id,
+                    'value': value,
+                    'salvage_value': rng.choice([0.0, round(value * rng.uniform(0.01, 0.2), 2)]),
+                    'date': date,
+                    'method': method,
+                    'method_time': method_time,
+                    'method_number': rng.randint(1, 60),
+                    'method_period': period,
+                    'method_end': date + relativedelta(months=rng.randint(1, 120)),
+                    'method_progress_factor': round(rng.uniform(0.1, 0.5), 2),
+                    'prorata': prorata,
+                    'date_first_depreciation': first_depreciation,
+                    'first_depreciation_manual_date': date + relativedelta(days=rng.choice([0, 10, 45, 200])),
+                })
+        for offset in range(0, len(vals_list), batch_size):
+            Benchmark.env['account.asset.asset'].create(vals_list[offset:offset + batch_size])
+            Benchmark._commit()
+            Benchmark.env.invalidate_all()
+            _logger.info("Benchmark assets: %s/%s assets generated",
+                         min(offset + batch_size, len(vals_list)), len(vals_list))
+        return company
+
+    @api.model
+    def _get_assets(self, company=None):
+        company = company or self.env['res.company'].search([('name', '=', BENCHMARK_COMPANY_NAME)], limit=1)
+        if not company:
+            raise UserError(_("Generate the benchmark assets first, or give the company to benchmark."))
+        return self.env['account.asset.asset'].with_company(company).search(
+            [('company_id', '=', company.id)], order='id')
+
+    @api.model
+    def _snapshot(self, assets):
+        """ Returns the unposted depreciation lines of the assets, as stored, in the
+            format of the golden output: {asset code: [[sequence, date, amount,
+            remaining value, depreciated value], ...]}.
+        """
+        self.env['account.asset.depreciation.line'].flush_model()
+        self.env.cr.execute("""
+            SELECT a.code, l.sequence, l.depreciation_date, l.amount, l.remaining_value, l.depreciated_value
+            FROM account_asset_depreciation_line l
+            JOIN account_asset_asset a ON a.id = l.asset_id
+            WHERE l.asset_id IN %s AND l.move_check IS NOT TRUE
+            ORDER BY a.code, l.sequence""", [tuple(assets.ids) or (None,)])
+        res = {code: [] for code in assets.mapped('code')}
+        for code, sequence, depreciation_date, amount, remaining_value, depreciated_value in self.env.cr.fetchall():
+            res[code].append([sequence, fields.Date.to_string(depreciation_date),
+                              amount, remaining_value, depreciated_value])
+        return res
+
+    @api.model
+    def _save_golden(self, company=None, output=None):
+        """ Compute the boards of the benchmark assets with the reference line by
+            line computation and return them as golden output, also written as JSON
+            to the file `output` when given.
+        """
+        assets = self._get_assets(company)
+        golden = self._run_legacy(assets)
+        if output:
+            with open(output, 'w') as f:
+                json.dump(golden, f, indent=1, sort_keys=True)
+        return golden
+
+    def _run_orm(self, assets):
+        """ compute_depreciation_board, writing the lines. """
+        assets.compute_depreciation_board()
+        return self._snapshot(assets)
+
+    def _format_line(self, asset, sequence, depreciation_date, amount, remaining_value, depreciated_value):
+        """ A depreciation line in the format of the golden output, the amounts
+            being rounded as they are when stored.
+        """
+        currency = asset.currency_id
+        return [sequence, fields.Date.to_string(depreciation_date),
+                currency.round(amount), currency.round(remaining_value), currency.round(depreciated_value)]
+
+    def _run_board_engine(self, assets):
+        """ The depreciation board engine alone, without writing any line. """
+        boards = compute_boards(assets._get_depreciation_board_params())
+        return {
+            asset.code: [self._format_line(asset, *line) for line in zip(*boards[asset.id])]
+            for asset in assets
+        }
+
+    def _run_legacy(self, assets):
+        """ The historical computation of compute_depreciation_board, one line after
+            the other on the records, without writing any line.
+        """
+        return {asset.code: self._legacy_board(asset) for asset in assets}
+
+    def _legacy_board(self, asset):
+        lines = []
+        posted_depreciation_line_ids = asset.depreciation_line_ids.filtered(
+            lambda x: x.move_check).sorted(key=lambda l: l.depreciation_date)
+        if asset.value_residual == 0.0:
+            return lines
+        amount_to_depr = residual_amount = asset.value_residual
+
+        # if we already have some previous validated entries, starting date is last entry + method period
+        if posted_depreciation_line_ids and posted_depreciation_line_ids[-1].depreciation_date:
+            last_depreciation_date = fields.Date.from_string(posted_depreciation_line_ids[-1].depreciation_date)
+            depreciation_date = last_depreciation_date + relativedelta(months=+asset.method_period)
+        else:
+            # depreciation_date computed from the purchase date
+            depreciation_date = asset.date
+            if asset.date_first_depreciation == 'last_day_period':
+                # depreciation_date = the last day of the month
+                depreciation_date = depreciation_date + relativedelta(day=31)
+                # ... or fiscalyear depending the number of period
+                if asset.method_period == 12:
+                    depreciation_date = depreciation_date + relativedelta(
+                        month=int(asset.company_id.fiscalyear_last_month))
+                    depreciation_date = depreciation_date + relativedelta(
+                        day=int(asset.company_id.fiscalyear_last_day))
+                    if depreciation_date < asset.date:
+                        depreciation_date = depreciation_date + relativedelta(years=1)
+            elif asset.first_depreciation_manual_date and asset.first_depreciation_manual_date != asset.date:
+                # depreciation_date set manually from the 'first_depreciation_manual_date' field
+                depreciation_date = asset.first_depreciation_manual_date
+        total_days = (depreciation_date.year % 4) and 365 or 366
+        month_day = depreciation_date.day
+
+        undone_dotation_number = asset.method_number
+        if asset.method_time == 'end':
+            end_date = asset.method_end
+            undone_dotation_number = 0
+            date = depreciation_date
+            while date <= end_date:
+                date = date + relativedelta(months=+asset.method_period)
+                undone_dotation_number += 1
+        if asset.prorata:
+            undone_dotation_number += 1
+
+        for x in range(len(posted_depreciation_line_ids), undone_dotation_number):
+            sequence = x + 1
+            amount = 0
+            if sequence == undone_dotation_number:
+                amount = residual_amount
+            elif asset.method == 'linear':
+                amount = amount_to_depr / (undone_dotation_number - len(posted_depreciation_line_ids))
+                if asset.prorata:
+                    amount = amount_to_depr / asset.method_number
+                    if sequence == 1:
+                        date = asset.date
+                        if asset.method_period % 12 != 0:
+                            month_days = calendar.monthrange(date.year, date.month)[1]
+                            days = month_days - date.day + 1
+                            amount = (amount_to_depr / asset.method_number) / month_days * days
+                        else:
+                            days = (asset.company_id.compute_fiscalyear_dates(date)['date_to'] - date).days + 1
+                            amount = (amount_to_depr / asset.method_number) / total_days * days
+            elif asset.method == 'degressive':
+                amount = residual_amount * asset.method_progress_factor
+                if asset.prorata and sequence == 1:
+                    date = asset.date
+                    if asset.method_period % 12 != 0:
+                        month_days = calendar.monthrange(date.year, date.month)[1]
+                        days = month_days - date.day + 1
+                        amount = (residual_amount * asset.method_progress_factor) / month_days * days
+                    else:
+                        days = (asset.company_id.compute_fiscalyear_dates(date)['date_to'] - date).days + 1
+                        amount = (residual_amount * asset.method_progress_factor) / total_days * days
+            amount = asset.currency_id.round(amount)
+            if float_is_zero(amount, precision_rounding=asset.currency_id.rounding):
+                continue
+            residual_amount -= amount
+            lines.append(self._format_line(asset, sequence, depreciation_date, amount, residual_amount,
+                                           asset.value - (asset.salvage_value + residual_amount)))
+
+            depreciation_date = depreciation_date + relativedelta(months=+asset.method_period)
+            if month_day > 28 and asset.date_first_depreciation == 'manual':
+                max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
+                depreciation_date = depreciation_date.replace(day=min(max_day_in_month, month_day))
+            # datetime doesn't take into account that the number of days is not the same for each month
+            if not asset.prorata and asset.method_period % 12 != 0 and asset.date_first_depreciation == 'last_day_period':
+                max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
+                depreciation_date = depreciation_date.replace(day=max_day_in_month)
+        return lines
+
+    @api.model
+    def _get_engines(self):
+        """ Returns a dictionary {name: method} of the engines compared with the
+            golden output, each method taking the assets and returning their boards
+            in the format of the golden output.
+        """
+        return {
+            'legacy': self._run_legacy,
+            'compute_depreciation_board': self._run_orm,
+            'board_engine': self._run_board_engine,
+        }
+
+    @api.model
+    def _diff(self, golden, result):
+        """ Returns the differences between two outputs, as a list of dictionaries
+            {'asset', 'line', 'field', 'golden', 'result', 'delta'}: one per differing
+            value, or per missing or extra line (with 'field' set to 'line').
+        """
+        diffs = []
+        for code in sorted(set(golden) | set(result)):
+            golden_lines = golden.get(code) or []
+            result_lines = result.get(code) or []
+            for index in range(max(len(golden_lines), len(result_lines))):
+                if index >= len(golden_lines) or index >= len(result_lines):
+                    diffs.append({
+                        'asset': code, 'line': index + 1, 'field': 'line',
+                        'golden': golden_lines[index] if index < len(golden_lines) else None,
+                        'result': result_lines[index] if index < len(result_lines) else None,
+                        'delta': None,
+                    })
+                    continue
+                for field, golden_value, result_value in zip(
+                        BENCHMARK_LINE_FIELDS, golden_lines[index], result_lines[index]):
+                    if golden_value != result_value:
+                        numeric = isinstance(golden_value, (int, float)) and isinstance(result_value, (int, float))
+                        diffs.append({
+                            'asset': code, 'line': index + 1, 'field': field,
+                            'golden': golden_value, 'result': result_value,
+                            'delta': result_value - golden_value if numeric else None,
+                        })
+        return diffs
+
+    @api.model
+    def _run_engine(self, engine, assets):
+        """ Run `engine` on the assets from cold caches. Returns its output and a
+            dictionary with the duration, the number of assets per second and the
+            number of queries.
+        """
+        self.env.flush_all()
+        self.env.invalidate_all()
+        self.env.cr.cache.clear()
+        assets = assets.browse(assets.ids)
+
+        cr = self.env.cr
+        queries = cr.sql_log_count
+        start = time.perf_counter()
+        result = engine(assets)
+        self.env.flush_all()
+        duration = time.perf_counter() - start
+        return result, {
+            'seconds': round(duration, 3),
+            'assets_per_second': round(len(assets) / duration, 1) if duration else None,
+            'queries': cr.sql_log_count - queries,
+        }
+
+    @api.model
+    def _run_benchmark(self, company=None, golden=None, engines=None, repeat=3, output=None):
+        """ Time the engines on the benchmark assets and compare their output with
+            the golden output, given as a dictionary or as the path of its JSON file
+            (computed by the reference engine when not given). Each engine is
+            run `repeat` times and the fastest run is kept. Returns the results as a
+            dictionary, also written as JSON to the file `output` when given.
+        """
+        assets = self._get_assets(company)
+        if isinstance(golden, str):
+            with open(golden) as f:
+                golden = json.load(f)
+        elif golden is None:
+            golden = self._save_golden(assets.company_id)
+
+        results = {}
+        for name, engine in self._get_engines().items():
+            if engines and name not in engines:
+                continue
+            runs = []
+            for dummy in range(max(repeat, 1)):
+                output_boards, stats = self._run_engine(engine, assets)
+                runs.append(stats)
+            diffs = self._diff(golden, output_boards)
+            results[name] = dict(min(runs, key=lambda run: run['seconds']),
+                                 differences=len(diffs), diffs=diffs)
+            _logger.info("Depreciation benchmark: %s %s s, %s assets/s, %s queries, %s differences",
+                         name, results[name]['seconds'], results[name]['assets_per_second'],
+                         results[name]['queries'], len(diffs))
+        res = {
+            'database': self.env.cr.dbname,
+            'server_version': release.version,
+            'date': fields.Datetime.to_string(fields.Datetime.now()),
+            'assets': len(assets),
+            'lines': sum(len(lines) for lines in golden.values()),
+            'repeat': repeat,
+            'results': results,
+        }
+        if output:
+            with open(output, 'w') as f:
+                json.dump(res, f, indent=2, sort_keys=True)
+        return res
@@ -0,0 +1,157 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import logging
+
+from odoo import api, fields, models, Command, _
+from odoo.tools import split_every
+
+_logger = logging.getLogger(__name__)
+
+# number of assets of an ungrouped category processed, and committed, together
+DEPRECIATION_RUN_CHUNK_SIZE = 200
+
+
+class AccountAssetDepreciationRun(models.Model):
+    _name = 'account.asset.depreciation.run'
+    _description = 'Asset Depreciation Run'
+    _order = 'id desc'
+
+    date = fields.Date('Depreciation Date', required=True, readonly=True, index=True)
+    chunk_ids = fields.One2many('account.asset.depreciation.run.chunk', 'run_id', string='Chunks', readonly=True)
+    # not stored: the workers update the chunks of a run concurrently
+    state = fields.Selection([
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ], 'Status', compute='_compute_state')
+    chunk_count = fields.Integer('Chunks', compute='_compute_state')
+    move_count = fields.Integer('Entries', compute='_compute_state')
+
+    @api.depends('chunk_ids.state', 'chunk_ids.move_count')
+    def _compute_state(self):
+        for run in self:
+            states = set(run.chunk_ids.mapped('state'))
+            if 'pending' in states:
+                run.state = 'running'
+            elif 'failed' in states:
+                run.state = 'failed'
+            else:
+                run.state = 'done'
+            run.chunk_count = len(run.chunk_ids)
+            run.move_count = sum(run.chunk_ids.mapped('move_count'))
+
+    @api.depends('date')
+    def _compute_display_name(self):
+        for run in self:
+            run.display_name = _("Depreciation of %s", run.date)
+
+    @api.model
+    def _create_run(self, date):
+        """ Create the run generating the depreciation entries of the running assets
+            up to `date`, split in chunks by company and category. The assets of a
+            category grouping its entries are kept in a single chunk, as they share
+            one entry.
+        """
+        chunk_vals = []
+        groups = self.env['account.asset.asset']._read_group(
+            [('state', '=', 'open')], ['company_id', 'category_id'], ['id:array_agg'])
+        for company, category, asset_ids in groups:
+            size = len(asset_ids) if category.group_entries else DEPRECIATION_RUN_CHUNK_SIZE
+            for chunk_asset_ids in split_every(size, sorted(asset_ids)):
+                chunk_vals.append({
+                    'company_id': company.id,
+                    'category_id': category.id,
+                    'group_entries': category.group_entries,
+                    'asset_ids': [Command.set(chunk_asset_ids)],
+                })
+        return self.create({'date': date, 'chunk_ids': [Command.create(vals) for vals in chunk_vals]})
+
+    def action_resume(self):
+        """ Queue the failed chunks of the runs again, the other ones are not processed
+            a second time.
+        """
+        chunks = self.chunk_ids.filtered(lambda chunk: chunk.state == 'failed')
+        chunks.write({'state': 'pending', 'error': False})
+        if chunks:
+            self.env.ref('om_account_asset.account_asset_run_worker_cron')._trigger()
+        return True
+
+    @api.model
+    def _cron_generate_entries(self, date=None):
+        """ Resume the failed chunks of the previous runs, create the run of `date`
+            unless it already exists, and process the chunks. The chunks are shared
+            with the worker cron, triggered to process them concurrently.
+        """
+        date = date or fields.Date.context_today(self)
+        self.env['account.asset.depreciation.run.chunk'].search([('state', '=', 'failed')]).run_id.action_resume()
+        if not self.search_count([('date', '=', date)]):
+            self._create_run(date)
+            self.env.ref('om_account_asset.account_asset_run_worker_cron')._trigger()
+        if not self.env.registry.in_test_mode():
+            self.env.cr.commit()
+        self.env['account.asset.depreciation.run.chunk']._process_chunks()
+
+
+class AccountAssetDepreciationRunChunk(models.Model):
+    _name = 'account.asset.depreciation.run.chunk'
+    _description = 'Asset Depreciation Run Chunk'
+    _order = 'id'
+
+    run_id = fields.Many2one('account.asset.depreciation.run', string='Run', required=True,
+                             readonly=True, index=True, ondelete='cascade')
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True)
+    category_id = fields.Many2one('account.asset.category', string='Category', required=True, readonly=True)
+    group_entries = fields.Boolean('Group Journal Entries', readonly=True)
+    asset_ids = fields.Many2many('account.asset.asset', string='Assets', readonly=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ], 'Status', required=True, default='pending', readonly=True, index=True)
+    move_count = fields.Integer('Entries', readonly=True)
+    date_done = fields.Datetime('Processed On', readonly=True)
+    error = fields.Text('Error', readonly=True)
+
+    @api.model
+    def _claim_chunk(self):
+        """ Lock and return a pending chunk, skipping those locked by the other
+            workers. The lock is held until the chunk is committed, so that a worker
+            dying in the middle of a chunk leaves it pending.
+        """
+        self.flush_model(['state'])
+        self.env.cr.execute("""
+            SELECT id FROM account_asset_depreciation_run_chunk
+            WHERE state = 'pending'
+            ORDER BY id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED""")
+        row = self.env.cr.fetchone()
+        return self.browse(row and row[0])
+
+    def _process(self):
+        self.ensure_one()
+        assets = self.asset_ids.filtered(lambda asset: asset.state == 'open')
+        move_ids = assets._compute_entries(self.run_id.date, group_entries=self.group_entries)
+        self.write({'state': 'done', 'move_count': len(move_ids), 'date_done': fields.Datetime.now(), 'error': False})
+
+    @api.model
+    def _process_chunks(self):
+        """ Process the pending chunks one by one, committing after each of them so
+            that a failing chunk only rolls back its own entries.
+        """
+        while True:
+            chunk = self._claim_chunk()
+            if not chunk:
+                break
+            try:
+                with self.env.cr.savepoint():
+                    chunk._process()
+            except Exception as e:
+                _logger.exception("Failed to generate the depreciation entries of the chunk %s", chunk.id)
+                chunk.write({'state': 'failed', 'date_done': fields.Datetime.now(), 'error': str(e)})
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+
+    @api.model
+    def _cron_process_chunks(self):
+        self._process_chunks()
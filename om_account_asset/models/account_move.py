@@ -44,11 +44,10 @@ class AccountMove(models.Model):
 
     def action_post(self):
         result = super(AccountMove, self).action_post()
-        for inv in self:
-            context = dict(self.env.context)
-            context.pop('default_type', None)
-            for mv_line in inv.invoice_line_ids:
-                mv_line.with_context(context).asset_create()
+        context = dict(self.env.context)
+        context.pop('default_type', None)
+        # the assets of all the posted invoices are created together
+        self.invoice_line_ids.with_context(context).asset_create()
         return result
 
 
@@ -112,31 +111,45 @@ class AccountMoveLine(models.Model):
                     rec.asset_end_date = end_date
 
     def asset_create(self):
-        if self.asset_category_id:
-            price_subtotal = self.currency_id._convert(
-                self.price_subtotal,
-                self.company_currency_id,
-                self.company_id,
-                self.move_id.invoice_date or fields.Date.context_today(
-                    self))
+        """ Create the assets of the lines having an asset category with a single
+            create, the defaults of the categories and the conversion rates being
+            read once, and validate those of the categories opening their assets.
+        """
+        lines = self.filtered('asset_category_id')
+        if not lines:
+            return True
+        Asset = self.env['account.asset.asset']
+        category_values = {}
+        rates = {}
+        vals_list = []
+        for line in lines:
+            category = line.asset_category_id
+            if category.id not in category_values:
+                category_values[category.id] = Asset.onchange_category_id_values(category.id)['value']
+            date = line.move_id.invoice_date or fields.Date.context_today(self)
+            rate_key = (line.currency_id, line.company_currency_id, line.company_id, date)
+            if rate_key not in rates:
+                rates[rate_key] = self.env['res.currency']._get_conversion_rate(*rate_key)
+            price_subtotal = line.price_subtotal and line.company_currency_id.round(
+                line.price_subtotal * rates[rate_key])
             vals = {
-                'name': self.name,
-                'code': self.name or False,
-                'category_id': self.asset_category_id.id,
+                'name': line.name,
+                'code': line.name or False,
+                'category_id': category.id,
                 'value': price_subtotal,
-                'partner_id': self.move_id.partner_id.id,
-                'company_id': self.move_id.company_id.id,
-                'currency_id': self.move_id.company_currency_id.id,
-                'date': self.move_id.invoice_date or self.move_id.date,
-                'invoice_id': self.move_id.id,
+                'partner_id': line.move_id.partner_id.id,
+                'company_id': line.move_id.company_id.id,
+                'currency_id': line.move_id.company_currency_id.id,
+                'date': line.move_id.invoice_date or line.move_id.date,
+                'invoice_id': line.move_id.id,
             }
-            changed_vals = self.env['account.asset.asset'].onchange_category_id_values(vals['category_id'])
-            vals.update(changed_vals['value'])
-            asset = self.env['account.asset.asset'].create(vals)
-            if self.asset_category_id.open_asset:
-                if asset.date_first_depreciation == 'manual':
-                    asset.first_depreciation_manual_date = asset.date
-                asset.validate()
+            vals.update(category_values[category.id])
+            if category.open_asset and vals['date_first_depreciation'] == 'manual':
+                vals['first_depreciation_manual_date'] = vals['date']
+            vals_list.append(vals)
+        # the depreciation boards are computed together by create
+        assets = Asset.create(vals_list)
+        assets.filtered(lambda asset: asset.category_id.open_asset).validate()
         return True
 
     @api.onchange('asset_category_id', 'product_uom_id')
@@ -0,0 +1,190 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+"""Depreciation schedules computed from the plain parameters of the assets.
+
+The functions of this module do not use the ORM: the parameters of many assets
+are read at once into ``AssetParams`` tuples and their schedules are computed
+in memory, with the same arithmetic (and thus the same amounts, to the last
+digit) as the historical line by line computation of
+``account.asset.asset.compute_depreciation_board``.
+"""
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+import calendar
+
+from odoo.tools import float_is_zero, float_round
+
+AssetParams = namedtuple('AssetParams', [
+    'code',                             # reference of the asset, used to name the lines
+    'value',                            # gross value
+    'salvage_value',
+    'value_residual',                   # value still to depreciate
+    'date',                             # purchase date
+    'method',                           # 'linear' or 'degressive'
+    'method_number',
+    'method_period',                    # months between two depreciations
+    'method_end',
+    'method_progress_factor',
+    'method_time',                      # 'number' or 'end'
+    'prorata',
+    'date_first_depreciation',          # 'last_day_period' or 'manual'
+    'first_depreciation_manual_date',
+    'posted_count',                     # number of depreciation lines linked to an entry
+    'last_posted_date',                 # date of the last of them
+    'fiscalyear_last_month',
+    'fiscalyear_last_day',
+    'fiscalyear_end',                   # end of the fiscal year of `date`, for yearly prorata
+    'rounding',                         # rounding of the currency of the asset
+])
+
+# parallel lists describing the depreciation lines still to post of an asset
+Board = namedtuple('Board', ['sequences', 'dates', 'amounts', 'remaining_values', 'depreciated_values'])
+
+
+@lru_cache(maxsize=4096)
+def month_days(year, month):
+    return calendar.monthrange(year, month)[1]
+
+
+def add_months(value, months):
+    """ Same as ``value + relativedelta(months=months)``. """
+    month = value.month - 1 + months
+    year = value.year + month // 12
+    month = month % 12 + 1
+    return date(year, month, min(value.day, month_days(year, month)))
+
+
+def first_depreciation_date(params):
+    """ Date of the first depreciation line still to post. """
+    if params.last_posted_date:
+        return add_months(params.last_posted_date, params.method_period)
+    depreciation_date = params.date
+    if params.date_first_depreciation == 'last_day_period':
+        # the last day of the month...
+        depreciation_date = date(depreciation_date.year, depreciation_date.month,
+                                 month_days(depreciation_date.year, depreciation_date.month))
+        # ... or of the fiscal year, depending on the number of periods
+        if params.method_period == 12:
+            month = int(params.fiscalyear_last_month)
+            depreciation_date = date(depreciation_date.year, month,
+                                     min(int(params.fiscalyear_last_day), month_days(depreciation_date.year, month)))
+            if depreciation_date < params.date:
+                year = depreciation_date.year + 1
+                depreciation_date = date(year, depreciation_date.month,
+                                         min(depreciation_date.day, month_days(year, depreciation_date.month)))
+    elif params.first_depreciation_manual_date and params.first_depreciation_manual_date != params.date:
+        depreciation_date = params.first_depreciation_manual_date
+    return depreciation_date
+
+
+def undone_dotation_number(params, depreciation_date):
+    """ Sequence of the last depreciation line of the asset. """
+    number = params.method_number
+    if params.method_time == 'end':
+        number = 0
+        while depreciation_date <= params.method_end:
+            depreciation_date = add_months(depreciation_date, params.method_period)
+            number += 1
+    if params.prorata:
+        number += 1
+    return number
+
+
+def board_amount(params, sequence, residual_amount, amount_to_depr, undone_number, total_days):
+    """ Amount of the depreciation line `sequence`, before rounding. """
+    if sequence == undone_number:
+        return residual_amount
+    if params.method == 'linear':
+        if not params.prorata:
+            return amount_to_depr / (undone_number - params.posted_count)
+        amount = amount_to_depr / params.method_number
+        if sequence == 1:
+            purchase_date = params.date
+            if params.method_period % 12 != 0:
+                days_in_month = month_days(purchase_date.year, purchase_date.month)
+                days = days_in_month - purchase_date.day + 1
+                amount = (amount_to_depr / params.method_number) / days_in_month * days
+            else:
+                days = (params.fiscalyear_end - purchase_date).days + 1
+                amount = (amount_to_depr / params.method_number) / total_days * days
+        return amount
+    if params.method == 'degressive':
+        amount = residual_amount * params.method_progress_factor
+        if params.prorata and sequence == 1:
+            purchase_date = params.date
+            if params.method_period % 12 != 0:
+                days_in_month = month_days(purchase_date.year, purchase_date.month)
+                days = days_in_month - purchase_date.day + 1
+                amount = (residual_amount * params.method_progress_factor) / days_in_month * days
+            else:
+                days = (params.fiscalyear_end - purchase_date).days + 1
+                amount = (residual_amount * params.method_progress_factor) / total_days * days
+        return amount
+    return 0
+
+
+def compute_board(params):
+    """ Returns the ``Board`` of the depreciation lines still to post of an asset. """
+    board = Board([], [], [], [], [])
+    if params.value_residual == 0.0:
+        return board
+    amount_to_depr = residual_amount = params.value_residual
+    depreciation_date = first_depreciation_date(params)
+    total_days = (depreciation_date.year % 4) and 365 or 366
+    month_day = depreciation_date.day
+    undone_number = undone_dotation_number(params, depreciation_date)
+    manual = params.date_first_depreciation == 'manual'
+    end_of_month = (not params.prorata and params.method_period % 12 != 0
+                    and params.date_first_depreciation == 'last_day_period')
+
+    for sequence in range(params.posted_count + 1, undone_number + 1):
+        amount = board_amount(params, sequence, residual_amount, amount_to_depr, undone_number, total_days)
+        amount = float_round(amount, precision_rounding=params.rounding)
+        if float_is_zero(amount, precision_rounding=params.rounding):
+            continue
+        residual_amount -= amount
+        board.sequences.append(sequence)
+        board.dates.append(depreciation_date)
+        board.amounts.append(amount)
+        board.remaining_values.append(residual_amount)
+        board.depreciated_values.append(params.value - (params.salvage_value + residual_amount))
+
+        depreciation_date = add_months(depreciation_date, params.method_period)
+        if month_day > 28 and manual:
+            depreciation_date = depreciation_date.replace(
+                day=min(month_days(depreciation_date.year, depreciation_date.month), month_day))
+        # the number of days is not the same for each month
+        if end_of_month:
+            depreciation_date = depreciation_date.replace(
+                day=month_days(depreciation_date.year, depreciation_date.month))
+    return board
+
+
+def compute_boards(params_by_key):
+    """ Returns a dictionary {key: Board} from a dictionary {key: AssetParams}. """
+    return {key: compute_board(params) for key, params in params_by_key.items()}
+
+
+def period_start(value, period):
+    """ First day of the month, or of the year when `period` is 'year', of `value`. """
+    if period == 'year':
+        return date(value.year, 1, 1)
+    return date(value.year, value.month, 1)
+
+
+def forecast_boards(params_by_key, group_by_key, date_from=None, date_to=None, period='month'):
+    """ Returns a dictionary {(period start, group): amount} summing the amounts of
+        the boards computed from `params_by_key` by period, `group_by_key` giving
+        the group of every key. Only the lines dated between `date_from` and
+        `date_to`, when given, are summed.
+    """
+    res = {}
+    for key, params in params_by_key.items():
+        group = group_by_key[key]
+        board = compute_board(params)
+        for depreciation_date, amount in zip(board.dates, board.amounts):
+            if (date_from and depreciation_date < date_from) or (date_to and depreciation_date > date_to):
+                continue
+            res_key = (period_start(depreciation_date, period), group)
+            res[res_key] = res.get(res_key, 0.0) + amount
+    return res
@@ -1,4 +1,12 @@
 from odoo import api, fields, models, tools
+from odoo.tools import split_every
+
+# fields of the assets and of their depreciation lines copied in the report
+ASSET_REPORT_ASSET_FIELDS = {'date', 'value', 'category_id', 'partner_id', 'state', 'company_id', 'active'}
+ASSET_REPORT_LINE_FIELDS = {'name', 'depreciation_date', 'amount', 'move_id', 'move_check', 'asset_id'}
+
+# number of assets refreshed, and committed, together by the scheduled refresh
+ASSET_REPORT_REFRESH_BATCH_SIZE = 1000
 
 
 class AssetAssetReport(models.Model):
@@ -23,43 +31,112 @@ class AssetAssetReport(models.Model):
     unposted_value = fields.Float(string='Unposted Amount', readonly=True)
     company_id = fields.Many2one('res.company', string='Company', readonly=True)
 
+    def _select(self):
+        """ One row per depreciation line of the active assets, the gross value of
+            an asset being counted on its first line only.
+        """
+        return """
+            SELECT
+                dl.id AS id,
+                dl.name AS name,
+                dl.depreciation_date AS depreciation_date,
+                a.date AS date,
+                (CASE WHEN dl.id = MIN(dl.id) OVER (PARTITION BY dl.asset_id)
+                  THEN a.value
+                  ELSE 0
+                  END) AS gross_value,
+                dl.amount AS depreciation_value,
+                dl.amount AS installment_value,
+                (CASE WHEN dl.move_check
+                  THEN dl.amount
+                  ELSE 0
+                  END) AS posted_value,
+                (CASE WHEN NOT dl.move_check
+                  THEN dl.amount
+                  ELSE 0
+                  END) AS unposted_value,
+                dl.asset_id AS asset_id,
+                dl.move_check AS move_check,
+                a.category_id AS asset_category_id,
+                a.partner_id AS partner_id,
+                a.state AS state,
+                1 AS installment_nbr,
+                1 AS depreciation_nbr,
+                a.company_id AS company_id
+            FROM account_asset_depreciation_line dl
+                JOIN account_asset_asset a ON (dl.asset_id = a.id)
+            WHERE a.active IS TRUE
+        """
+
     def init(self):
+        # the report is a table refreshed incrementally instead of a view, so that
+        # reading it does not aggregate all the depreciation lines again
         tools.drop_view_if_exists(self._cr, 'asset_asset_report')
+        self._cr.execute("DROP TABLE IF EXISTS asset_asset_report")
+        self._cr.execute("CREATE TABLE asset_asset_report AS (%s)" % self._select())
+        self._cr.execute("ALTER TABLE asset_asset_report ADD PRIMARY KEY (id)")
+        for column in ('asset_id', 'depreciation_date', 'date', 'asset_category_id', 'company_id'):
+            self._cr.execute("CREATE INDEX IF NOT EXISTS asset_asset_report_%s_index ON asset_asset_report (%s)"
+                             % (column, column))
+
+    @api.model
+    def _refresh(self, asset_ids=None):
+        """ Compute again the rows of the given assets, or of all the assets. """
+        self.env['account.asset.asset'].flush_model()
+        self.env['account.asset.depreciation.line'].flush_model()
+        if asset_ids is None:
+            self._cr.execute("DELETE FROM asset_asset_report")
+            self._cr.execute("INSERT INTO asset_asset_report (%s)" % self._select())
+        elif asset_ids:
+            asset_ids = tuple(asset_ids)
+            self._cr.execute("DELETE FROM asset_asset_report WHERE asset_id IN %s", [asset_ids])
+            self._cr.execute("INSERT INTO asset_asset_report (%s AND dl.asset_id IN %%s)" % self._select(), [asset_ids])
+        self.invalidate_model()
+
+    @api.model
+    def _mark_assets(self, asset_ids):
+        """ Schedule the refresh of the rows of the given assets, done in one go
+            before the report is read or the transaction is committed.
+        """
+        asset_ids = {asset_id for asset_id in asset_ids if asset_id}
+        if not asset_ids:
+            return
+        todo = self.env.cr.precommit.data.setdefault('asset.asset.report.asset_ids', set())
+        if not todo:
+            self.env.cr.precommit.add(self._refresh_marked_assets)
+        todo.update(asset_ids)
+
+    @api.model
+    def _refresh_marked_assets(self):
+        asset_ids = self.env.cr.precommit.data.pop('asset.asset.report.asset_ids', None)
+        if asset_ids:
+            self._refresh(asset_ids)
+
+    @api.model
+    def _read_group(self, *args, **kwargs):
+        self._refresh_marked_assets()
+        return super()._read_group(*args, **kwargs)
+
+    def search_fetch(self, *args, **kwargs):
+        self._refresh_marked_assets()
+        return super().search_fetch(*args, **kwargs)
+
+    def fetch(self, *args, **kwargs):
+        self._refresh_marked_assets()
+        return super().fetch(*args, **kwargs)
+
+    @api.model
+    def _cron_refresh(self):
+        """ Compute again all the rows, by batches of assets committed one after the
+            other, so that no lock is held on the whole report while it runs.
+        """
+        self.env['account.asset.asset'].flush_model()
         self._cr.execute("""
-            create or replace view asset_asset_report as (
-                select
-                    min(dl.id) as id,
-                    dl.name as name,
-                    dl.depreciation_date as depreciation_date,
-                    a.date as date,
-                    (CASE WHEN dlmin.id = min(dl.id)
-                      THEN a.value
-                      ELSE 0
-                      END) as gross_value,
-                    dl.amount as depreciation_value,
-                    dl.amount as installment_value,
-                    (CASE WHEN dl.move_check
-                      THEN dl.amount
-                      ELSE 0
-                      END) as posted_value,
-                    (CASE WHEN NOT dl.move_check
-                      THEN dl.amount
-                      ELSE 0
-                      END) as unposted_value,
-                    dl.asset_id as asset_id,
-                    dl.move_check as move_check,
-                    a.category_id as asset_category_id,
-                    a.partner_id as partner_id,
-                    a.state as state,
-                    count(dl.*) as installment_nbr,
-                    count(dl.*) as depreciation_nbr,
-                    a.company_id as company_id
-                from account_asset_depreciation_line dl
-                    left join account_asset_asset a on (dl.asset_id=a.id)
-                    left join (select min(d.id) as id,ac.id as ac_id from account_asset_depreciation_line as d inner join account_asset_asset as ac ON (ac.id=d.asset_id) group by ac_id) as dlmin on dlmin.ac_id=a.id
-                where a.active is true 
-                group by
-                    dl.amount,dl.asset_id,dl.depreciation_date,dl.name,
-                    a.date, dl.move_check, a.state, a.category_id, a.partner_id, a.company_id,
-                    a.value, a.id, a.salvage_value, dlmin.id
-        )""")
+            DELETE FROM asset_asset_report r
+            WHERE NOT EXISTS (SELECT 1 FROM account_asset_asset a WHERE a.id = r.asset_id AND a.active IS TRUE)""")
+        self._cr.execute("SELECT id FROM account_asset_asset WHERE active IS TRUE ORDER BY id")
+        asset_ids = [row[0] for row in self._cr.fetchall()]
+        for batch_asset_ids in split_every(ASSET_REPORT_REFRESH_BATCH_SIZE, asset_ids):
+            self._refresh(batch_asset_ids)
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
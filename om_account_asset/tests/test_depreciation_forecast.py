@@ -0,0 +1,46 @@
+from odoo import fields
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestDepreciationForecast(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.category = cls.env['account.asset.category'].create({
+            'name': 'Test Assets',
+            'account_asset_id': cls.company_data['default_account_assets'].id,
+            'account_depreciation_id': cls.company_data['default_account_assets'].id,
+            'account_depreciation_expense_id': cls.company_data['default_account_expense'].id,
+            'journal_id': cls.company_data['default_journal_misc'].id,
+            'method_number': 12,
+            'method_period': 1,
+        })
+        cls.asset = cls.env['account.asset.asset'].create({
+            'name': 'Prorata Monthly Asset',
+            'category_id': cls.category.id,
+            'value': 1200.0,
+            'date': fields.Date.to_date('2024-03-15'),
+            'method': 'linear',
+            'method_time': 'number',
+            'method_number': 12,
+            'method_period': 1,
+            'prorata': True,
+        })
+
+    def test_forecast(self):
+        forecast = self.asset._get_depreciation_forecast()
+        self.assertEqual(len(forecast), 13)
+        self.assertAlmostEqual(sum(line['amount'] for line in forecast), 1200.0)
+
+    def test_forecast_yearly_override_of_monthly_prorata(self):
+        # the yearly prorata needs the end of the fiscal year, which the stored
+        # monthly period alone would not require
+        forecast = self.asset._get_depreciation_forecast(period='year', overrides={'method_period': 12})
+        self.assertEqual([line['date'].year for line in forecast], list(range(2024, 2037)))
+        self.assertAlmostEqual(sum(line['amount'] for line in forecast), 1200.0)
+        fiscalyear_end = self.env.company.compute_fiscalyear_dates(self.asset.date)['date_to']
+        days = (fiscalyear_end - self.asset.date).days + 1
+        self.assertAlmostEqual(forecast[0]['amount'], round(100.0 / 366 * days, 2))
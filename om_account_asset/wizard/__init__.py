@@ -1,4 +1,5 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
 from . import asset_depreciation_confirmation_wizard
+from . import asset_depreciation_forecast
 from . import asset_modify
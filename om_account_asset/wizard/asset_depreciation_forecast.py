@@ -0,0 +1,69 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import fields, models, Command, _
+
+
+class AssetDepreciationForecast(models.TransientModel):
+    _name = 'asset.depreciation.forecast'
+    _description = 'Depreciation Forecast'
+
+    date_from = fields.Date('Start Date', required=True, default=fields.Date.context_today)
+    date_to = fields.Date('End Date', required=True,
+                          default=lambda self: fields.Date.context_today(self) + relativedelta(years=3))
+    period = fields.Selection([('month', 'Month'), ('year', 'Year')], string='Period', required=True, default='month')
+    include_draft = fields.Boolean('Include Draft Assets', default=True)
+    category_ids = fields.Many2many('account.asset.category', string='Asset Categories',
+                                    domain=[('type', '=', 'purchase')],
+                                    help="Leave empty to forecast all the asset categories.")
+    method = fields.Selection([('linear', 'Linear'), ('degressive', 'Degressive')], string='Computation Method',
+                              help="Simulate this computation method instead of the one of the assets.")
+    method_number = fields.Integer('Number of Depreciations',
+                                   help="Simulate this number of depreciations instead of the one of the assets.")
+    method_period = fields.Integer('Number of Months in a Period',
+                                   help="Simulate this period length instead of the one of the assets.")
+    method_progress_factor = fields.Float('Degressive Factor',
+                                          help="Simulate this degressive factor instead of the one of the assets.")
+    line_ids = fields.One2many('asset.depreciation.forecast.line', 'forecast_id', string='Forecast')
+
+    def _get_assets(self):
+        states = ['draft', 'open'] if self.include_draft else ['open']
+        domain = [('state', 'in', states), ('type', '=', 'purchase')]
+        if self.category_ids:
+            domain.append(('category_id', 'in', self.category_ids.ids))
+        return self.env['account.asset.asset'].search(domain)
+
+    def _get_overrides(self):
+        return {
+            name: self[name]
+            for name in ('method', 'method_number', 'method_period', 'method_progress_factor')
+            if self[name]
+        }
+
+    def action_compute(self):
+        self.ensure_one()
+        forecast = self._get_assets()._get_depreciation_forecast(
+            self.date_from, self.date_to, self.period, self._get_overrides())
+        self.line_ids = [Command.clear()] + [Command.create(vals) for vals in forecast]
+        return {
+            'name': _('Depreciation Forecast'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'asset.depreciation.forecast.line',
+            'view_mode': 'pivot,graph,list',
+            'domain': [('forecast_id', '=', self.id)],
+            'context': {'pivot_column_groupby': ['date:%s' % self.period], 'pivot_row_groupby': ['category_id']},
+        }
+
+
+class AssetDepreciationForecastLine(models.TransientModel):
+    _name = 'asset.depreciation.forecast.line'
+    _description = 'Depreciation Forecast Line'
+    _order = 'date, id'
+
+    forecast_id = fields.Many2one('asset.depreciation.forecast', string='Forecast', required=True, ondelete='cascade')
+    date = fields.Date('Period', required=True)
+    category_id = fields.Many2one('account.asset.category', string='Asset Category')
+    company_id = fields.Many2one('res.company', string='Company')
+    currency_id = fields.Many2one(related='company_id.currency_id')
+    amount = fields.Monetary('Depreciation', currency_field='currency_id')
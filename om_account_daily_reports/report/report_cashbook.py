@@ -31,12 +31,11 @@ class ReportCashBook(models.AbstractModel):
 
         # Prepare initial sql query and Get the initial move lines
         if init_balance:
-            init_tables, init_where_clause, init_where_params = MoveLine.with_context(date_from=self.env.context.get('date_from'), date_to=False,initial_bal=True)._query_get()
+            init_where_clause, init_where_params = MoveLine.with_context(date_from=self.env.context.get('date_from'), date_to=False,initial_bal=True)._query_get_aliased()
             init_wheres = [""]
             if init_where_clause.strip():
                 init_wheres.append(init_where_clause.strip())
-            init_filters = " AND ".join(init_wheres)
-            filters = init_filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
+            filters = " AND ".join(init_wheres)
             sql = ("""
                     SELECT 0 AS lid, 
                     l.account_id AS account_id, '' AS ldate, '' AS lcode, 
@@ -61,12 +60,11 @@ class ReportCashBook(models.AbstractModel):
             sql_sort = 'j.code, p.name, l.move_id'
 
         # Prepare sql query base on selected parameters from wizard
-        tables, where_clause, where_params = MoveLine._query_get()
+        where_clause, where_params = MoveLine._query_get_aliased()
         wheres = [""]
         if where_clause.strip():
             wheres.append(where_clause.strip())
         filters = " AND ".join(wheres)
-        filters = filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
         if not accounts:
             journals = self.env['account.journal'].search([('type', '=', 'cash')])
             accounts = self.env['account.account']
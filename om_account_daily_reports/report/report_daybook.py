@@ -1,31 +1,37 @@
 import time
 from odoo import api, models, fields, _
 from odoo.exceptions import UserError
-from datetime import timedelta, datetime
 
 
 class ReportDayBook(models.AbstractModel):
     _name = 'report.om_account_daily_reports.report_daybook'
     _description = 'Day Book'
 
-    def _get_account_move_entry(self, accounts, form_data, date):
-        cr = self.env.cr
-        MoveLine = self.env['account.move.line']
-        init_wheres = [""]
+    def _get_account_move_entries(self, accounts, form_data, date_from, date_to):
+        """ Fetch the move lines between `date_from` and `date_to` with a single
+            query ordered by date, and group them into one section per day.
 
-        init_tables, init_where_clause, init_where_params =MoveLine._query_get()
-        if init_where_clause.strip():
-            init_wheres.append(init_where_clause.strip())
+            The lines are restricted to `accounts` when given, and to the allowed
+            companies otherwise. Days without any move line are not returned.
+        """
+        cr = self.env.cr
         if form_data['target_move'] == 'posted':
             target_move = "AND m.state = 'posted'"
         else:
             target_move = ''
 
+        if accounts is None:
+            account_filter = "l.company_id IN %s"
+            account_params = tuple(self.env.companies.ids)
+        else:
+            account_filter = "l.account_id IN %s"
+            account_params = tuple(accounts.ids) or (None,)
+
         sql = ("""
                     SELECT 0 AS lid, 
                           l.account_id AS account_id, l.date AS ldate, j.code AS lcode, 
                           l.amount_currency AS amount_currency,l.ref AS lref,l.name AS lname, 
-                          COALESCE(SUM(l.credit),0.0) AS credit,COALESCE(l.debit,0) AS debit,COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit),0) as balance, 
+                          COALESCE(l.credit,0.0) AS credit,COALESCE(l.debit,0.0) AS debit,COALESCE(l.debit,0.0) - COALESCE(l.credit,0.0) as balance, 
                               m.name AS move_name, 
                               c.symbol AS currency_code, 
                               p.name AS lpartner_id, 
@@ -36,38 +42,39 @@ class ReportDayBook(models.AbstractModel):
                               LEFT JOIN res_currency c ON (l.currency_id = c.id) 
                               LEFT JOIN res_partner p ON (l.partner_id = p.id) 
                               JOIN account_journal j ON (l.journal_id = j.id) 
-                              JOIN account_account acc ON (l.account_id = acc.id) 
                             WHERE 
-                              l.account_id IN %s 
+                              """ + account_filter + """ 
                               AND l.journal_id IN %s """ + target_move + """ 
-                              AND l.date = %s 
-                            GROUP BY 
-                              l.id, 
-                              l.account_id, 
-                              l.date, 
-                              m.name, 
-                              m.id, 
-                              p.name, 
-                              c.symbol, 
-                              j.code, 
-                              l.ref 
+                              AND l.date BETWEEN %s AND %s 
                             ORDER BY 
-                              l.date DESC
+                              l.date, l.move_id, l.id
                      """)
 
-        where_params = (tuple(accounts.ids), tuple(form_data['journal_ids']), date)
+        where_params = (account_params, tuple(form_data['journal_ids']), date_from, date_to)
         cr.execute(sql, where_params)
-        data = cr.dictfetchall()
-        res = {}
-        debit = credit = balance = 0.00
-        for line in data:
-            debit += line['debit']
-            credit += line['credit']
-            balance += line['balance']
-        res['debit'] = debit
-        res['credit'] = credit
-        res['balance'] = balance
-        res['lines'] = data
+        record = []
+        day = None
+        for line in cr.dictfetchall():
+            if day is None or day['date'] != line['ldate']:
+                day = {
+                    'date': line['ldate'],
+                    'debit': 0.0,
+                    'credit': 0.0,
+                    'balance': 0.0,
+                    'move_lines': [],
+                }
+                record.append(day)
+            day['debit'] += line['debit']
+            day['credit'] += line['credit']
+            day['balance'] += line['balance']
+            day['move_lines'].append(line)
+        return record
+
+    def _get_account_move_entry(self, accounts, form_data, date):
+        res = {'debit': 0.0, 'credit': 0.0, 'balance': 0.0, 'lines': []}
+        for day in self._get_account_move_entries(accounts, form_data, date, date):
+            res.update(debit=day['debit'], credit=day['credit'],
+                       balance=day['balance'], lines=day['move_lines'])
         return res
 
     @api.model
@@ -85,23 +92,8 @@ class ReportDayBook(models.AbstractModel):
         if data['form'].get('journal_ids', False):
             codes = [journal.code for journal in
                      self.env['account.journal'].browse(data['form']['journal_ids'])]
-        accounts = self.env['account.account'].search([])
-        dates = []
-        record = []
-        days_total = date_to - date_from
-        for day in range(days_total.days + 1):
-            dates.append(date_from + timedelta(days=day))
-        for date in dates:
-            date_data = str(date)
-            accounts_res = self.with_context(data['form'].get('comparison_context', {}))._get_account_move_entry(accounts, form_data, date_data)
-            if accounts_res['lines']:
-                record.append({
-                    'date': date,
-                    'debit': accounts_res['debit'],
-                    'credit': accounts_res['credit'],
-                    'balance': accounts_res['balance'],
-                    'move_lines': accounts_res['lines']
-                })
+        record = self.with_context(data['form'].get('comparison_context', {}))._get_account_move_entries(
+            None, form_data, date_from, date_to)
         return {
             'doc_ids': docids,
             'doc_model': model,
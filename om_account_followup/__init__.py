@@ -1,3 +1,7 @@
 from . import wizard
 from . import models
 from . import report
+
+
+def _uninstall_drop_followup_index(env):
+    env.cr.execute("DROP INDEX IF EXISTS om_account_followup_aml_open_debit_idx")
@@ -23,5 +23,6 @@
         'report/followup_report.xml',
     ],
     'demo': ['demo/demo.xml'],
+    'uninstall_hook': '_uninstall_drop_followup_index',
     'images': ['static/description/banner.png'],
 }
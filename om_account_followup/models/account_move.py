@@ -8,6 +8,16 @@ class AccountMoveLine(models.Model):
     followup_date = fields.Date('Latest Follow-up')
     result = fields.Float(compute='_get_result', string="Balance Amount")
 
+    def init(self):
+        super().init()
+        # open receivable debit items, used by the follow-up run; replaces the
+        # previous index which also covered the credit items
+        self.env.cr.execute("DROP INDEX IF EXISTS om_account_followup_aml_unreconciled_idx")
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS om_account_followup_aml_open_debit_idx
+            ON account_move_line (company_id, partner_id, date)
+            WHERE full_reconcile_id IS NULL AND partner_id IS NOT NULL AND debit > 0""")
+
     def _get_result(self):
         for aml in self:
             aml.result = aml.debit - aml.credit
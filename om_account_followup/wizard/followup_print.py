@@ -1,4 +1,3 @@
-import datetime
 import time
 from odoo import api, fields, models, _
 from markupsafe import Markup
@@ -100,11 +99,16 @@ class FollowupPrint(models.TransientModel):
         return result
 
     def do_update_followup_level(self, to_update, partner_list, date):
-        for id in to_update.keys():
-            if to_update[id]['partner_id'] in partner_list:
-                self.env['account.move.line'].browse([int(id)]).write(
-                    {'followup_line_id': to_update[id]['level'],
-                     'followup_date': date})
+        # the lines reaching the same level are written together
+        partner_ids = set(partner_list)
+        line_ids_by_level = {}
+        for line_id, level_id, partner_id in to_update:
+            if partner_id in partner_ids:
+                line_ids_by_level.setdefault(level_id, []).append(line_id)
+        for level_id, line_ids in line_ids_by_level.items():
+            self.env['account.move.line'].browse(line_ids).write(
+                {'followup_line_id': level_id,
+                 'followup_date': date})
 
     def clear_manual_actions(self, partner_list):
         partner_list_ids = [partner.partner_id.id for partner in self.env[
@@ -161,65 +165,46 @@ class FollowupPrint(models.TransientModel):
         return self.env.user.company_id.follow_up_msg
 
     def _get_partners_followp(self):
+        """ Returns the follow-up statistics IDs of the partners to follow up and,
+            in 'to_update', the (move line ID, follow-up level ID, statistics ID)
+            triples of their open receivable lines reaching their next level. The
+            next level of every line is picked by a single query.
+        """
         data = self
         company_id = data.company_id.id
         context = self.env.context
-        self._cr.execute(
-            '''SELECT
-                    l.partner_id,
-                    l.followup_line_id,
-                    l.date_maturity,
-                    l.date, l.id
-                FROM account_move_line AS l
-                LEFT JOIN account_account AS a
-                ON (l.account_id=a.id)
-                WHERE (l.full_reconcile_id IS NULL)
-                AND a.account_type = 'asset_receivable'
-                AND (l.partner_id is NOT NULL)
-                AND (l.debit > 0)
-                AND (l.company_id = %s)
-                ORDER BY l.date''' % (company_id))
-        move_lines = self._cr.fetchall()
-        old = None
-        fups = {}
         fup_id = 'followup_id' in context and context[
             'followup_id'] or data.followup_id.id
         date = 'date' in context and context['date'] or data.date
-        date = fields.Date.to_string(date)
-        current_date = datetime.date(*time.strptime(date, '%Y-%m-%d')[:3])
+        self.env['account.move.line'].flush_model(
+            ['partner_id', 'followup_line_id', 'date_maturity', 'date',
+             'full_reconcile_id', 'account_id', 'debit', 'company_id'])
+        # each level follows the one of lower delay, the first one following
+        # the lines without level; the lines of the last level are left as is
         self._cr.execute(
-            '''SELECT *
-            FROM followup_line
-            WHERE followup_id=%s
-            ORDER BY delay''' % (fup_id,))
-
-        for result in self._cr.dictfetchall():
-            delay = datetime.timedelta(days=result['delay'])
-            fups[old] = (current_date - delay, result['id'])
-            old = result['id']
-
-        partner_list = []
-        to_update = {}
-
-        for partner_id, followup_line_id, date_maturity, date, id in \
-                move_lines:
-            if not partner_id:
-                continue
-            if followup_line_id not in fups:
-                continue
-            stat_line_id = partner_id * 10000 + company_id
-            if date_maturity:
-                date_maturity = fields.Date.to_string(date_maturity)
-                if date_maturity <= fups[followup_line_id][0].strftime(
-                        '%Y-%m-%d'):
-                    if stat_line_id not in partner_list:
-                        partner_list.append(stat_line_id)
-                    to_update[str(id)] = {'level': fups[followup_line_id][1],
-                                          'partner_id': stat_line_id}
-            elif date and date <= fups[followup_line_id][0].strftime(
-                    '%Y-%m-%d'):
-                if stat_line_id not in partner_list:
-                    partner_list.append(stat_line_id)
-                to_update[str(id)] = {'level': fups[followup_line_id][1],
-                                      'partner_id': stat_line_id}
+            '''WITH levels AS (
+                SELECT id, delay,
+                       LAG(id) OVER (ORDER BY delay, id) AS previous_id
+                FROM followup_line
+                WHERE followup_id = %(followup_id)s
+            )
+            SELECT l.id, next_level.id, l.partner_id
+            FROM account_move_line AS l
+            JOIN account_account AS a ON (l.account_id = a.id)
+            JOIN levels AS next_level
+                ON (COALESCE(next_level.previous_id, 0) = COALESCE(l.followup_line_id, 0))
+            WHERE (l.full_reconcile_id IS NULL)
+            AND a.account_type = 'asset_receivable'
+            AND (l.partner_id IS NOT NULL)
+            AND (l.debit > 0)
+            AND (l.company_id = %(company_id)s)
+            AND COALESCE(l.date_maturity, l.date) <= %(date)s::date - next_level.delay
+            ORDER BY l.date, l.id''',
+            {'followup_id': fup_id, 'company_id': company_id, 'date': date})
+        to_update = [
+            (line_id, level_id, partner_id * 10000 + company_id)
+            for line_id, level_id, partner_id in self._cr.fetchall()
+        ]
+        partner_list = list(dict.fromkeys(
+            partner_id for dummy, dummy, partner_id in to_update))
         return {'partner_ids': partner_list, 'to_update': to_update}